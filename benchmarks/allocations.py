@@ -0,0 +1,39 @@
+"""Report memory allocations of parsing and formatting each message of the corpus.
+
+Run with: python benchmarks/allocations.py [--corpus NAME]
+
+For every message, the number of blocks and bytes still allocated after the
+call (the result and anything cached) and the peak of transient allocations
+during the call are reported. The same measurement is available in tests
+through the `allocations` fixture.
+"""
+
+import argparse
+
+from corpus import CORPORA
+
+from messageformat2 import Message
+from messageformat2.instrumentation import measure_allocations
+from messageformat2.parser import parse
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", choices=CORPORA, action="append", help="Corpora to measure (default: all)")
+    args = parser.parse_args()
+
+    print(f"{'message':<24} {'phase':<8} {'blocks':>8} {'bytes':>10} {'peak':>10}")
+    for name in args.corpus or CORPORA:
+        for i, (source, inputs) in enumerate(CORPORA[name](count=5)):
+            message = Message(source)
+            phases = {
+                "parse": lambda source=source: parse(source),
+                "format": lambda message=message, inputs=inputs: message.format(inputs, "en"),
+            }
+            for phase, fn in phases.items():
+                result = measure_allocations(fn)
+                print(f"{f'{name}[{i}]':<24} {phase:<8} {result.blocks:>8} {result.size:>10} {result.peak:>10}")
+
+
+if __name__ == "__main__":
+    main()
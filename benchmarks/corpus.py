@@ -0,0 +1,53 @@
+"""Synthetic message corpus used by the benchmark suite.
+
+Every generator returns a list of `(message, inputs)` pairs. The corpus is
+deterministic so that results are comparable between runs.
+"""
+
+from typing import Any
+
+
+type Corpus = list[tuple[str, dict[str, Any]]]
+
+
+def simple_messages(count: int = 100) -> Corpus:
+    return [(f"Hello, {{$name}}! You are visitor number {i}.", {"name": f"User {i}"}) for i in range(count)]
+
+
+def complex_messages(count: int = 100) -> Corpus:
+    corpus = []
+    for i in range(count):
+        message = f"""\
+.input {{$count :number minimumFractionDigits=2}}
+.local $name = {{$user}}
+.local $item = {{|item {i}|}}
+{{{{{{#strong}}{{$name}}{{/strong}} bought {{$count}} of {{$item}} on {{$date :date style=medium}}.}}}}"""
+        corpus.append((message, {"count": i * 1.5, "user": f"User {i}", "date": "2024-06-07"}))
+    return corpus
+
+
+def many_variant_messages(count: int = 20, variants: int = 50) -> Corpus:
+    corpus = []
+    for i in range(count):
+        lines = [".input {$count :integer}", ".match {$count}"]
+        lines.extend(f"{n} {{{{Exactly {n} items}}}}" for n in range(variants))
+        lines.extend(("one {{One item}}", "* {{{$count} items}}"))
+        corpus.append(("\n".join(lines), {"count": (i * 7) % (variants * 2)}))
+    return corpus
+
+
+def long_text_messages(count: int = 10, length: int = 10_000) -> Corpus:
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+    corpus = []
+    for i in range(count):
+        text = " ".join(words[n % len(words)] for n in range(length // 6))
+        corpus.append((f"{text} {{$value}} {text}", {"value": i}))
+    return corpus
+
+
+CORPORA = {
+    "simple": simple_messages,
+    "complex": complex_messages,
+    "many-variant": many_variant_messages,
+    "long-text": long_text_messages,
+}
@@ -0,0 +1,63 @@
+"""Benchmark `mf2 extract` on a generated source tree.
+
+Run with: python benchmarks/extract.py [--files N] [--jobs N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from messageformat2.cli import cli
+
+
+SOURCE = '''\
+import os
+
+
+def view_{i}(request, count):
+    title = _("Page {i}")
+    body = _("""\\
+.match {{$count :integer}}
+one {{{{You have one item}}}}
+*   {{{{You have {{$count}} items}}}}""")
+    return render(request, title=title, body=body, path=os.getcwd())
+'''
+
+PLAIN = """\
+def helper_{i}(values):
+    return [value * {i} for value in values if value]
+"""
+
+
+def generate(root: Path, count: int) -> None:
+    for i in range(count):
+        package = root / f"pkg{i % 100}"
+        package.mkdir(exist_ok=True)
+        # Most files in a real code base contain no messages
+        template = SOURCE if i % 5 == 0 else PLAIN
+        (package / f"module{i}.py").write_text(template.format(i=i) * 20)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate(root, args.files)
+        for jobs in sorted({1, args.jobs}):
+            start = time.perf_counter()
+            result = CliRunner().invoke(cli, ["extract", "--jobs", str(jobs), str(root)])
+            elapsed = time.perf_counter() - start
+            assert result.exit_code == 0, result.output
+            print(f"{args.files} files, --jobs {jobs}: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
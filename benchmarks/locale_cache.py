@@ -0,0 +1,34 @@
+"""Compare locale resolution with and without the locale cache.
+
+Run with: python benchmarks/locale_cache.py
+"""
+
+import timeit
+
+from babel import Locale
+
+from messageformat2 import Message
+from messageformat2.builtins import get_locale
+
+
+NUMBER = 100_000
+
+
+def main() -> None:
+    message = Message("Hello, {$name}!")
+    inputs = {"name": "Alice"}
+
+    benchmarks = {
+        "Locale.parse('en_US')": lambda: Locale.parse("en_US"),
+        "get_locale('en_US')": lambda: get_locale("en_US"),
+        "Locale.default()": Locale.default,
+        "get_locale(None)": get_locale,
+        "Message.format(locale='en_US')": lambda: message.format(inputs, "en_US"),
+    }
+    for name, fn in benchmarks.items():
+        seconds = min(timeit.repeat(fn, number=NUMBER, repeat=5))
+        print(f"{name:<32} {seconds / NUMBER * 1e9:>10.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
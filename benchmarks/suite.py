@@ -0,0 +1,119 @@
+"""Benchmark parsing, validation, formatting and selection on a synthetic corpus.
+
+Run with: python benchmarks/suite.py [--save FILE] [--compare FILE] [--threshold 0.2]
+
+Results are reported in microseconds per message. `--save` stores them as a
+baseline and `--compare` reports the change against a stored baseline, exiting
+with a non-zero status if any benchmark regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+from babel import Locale
+from corpus import CORPORA, Corpus
+
+from messageformat2 import Message
+from messageformat2.builtins import default_registry
+from messageformat2.datamodel import DataModelValidator, SelectMessage
+from messageformat2.parser import parse_message
+from messageformat2.runtime import FormattingContext, compile_message, select_pattern
+
+
+REPEAT = 5
+
+
+def measure(fn: Callable[[], object], count: int, number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=REPEAT))
+    return seconds / number / count * 1e6
+
+
+def benchmarks(corpus: Corpus) -> dict[str, Callable[[], object]]:
+    sources = [source for source, _ in corpus]
+    asts = [parse_message(source) for source in sources]
+    messages = [(Message(source), inputs) for source, inputs in corpus]
+    for message, inputs in messages:
+        message.format(inputs, "en")
+
+    def parse_all() -> None:
+        for source in sources:
+            parse_message(source)
+
+    def validate_all() -> None:
+        for ast in asts:
+            DataModelValidator().visit(ast)
+
+    def format_all() -> None:
+        for message, inputs in messages:
+            message.format(inputs, "en")
+
+    phases = {"parse": parse_all, "validate": validate_all, "format": format_all}
+    if all(isinstance(ast, SelectMessage) for ast in asts):
+        phases["select"] = selector(corpus)
+    return phases
+
+
+def selector(corpus: Corpus) -> Callable[[], object]:
+    """Time selector resolution and variant matching without formatting the chosen pattern."""
+    locale = Locale.parse("en")
+    compiled = [(compile_message(parse_message(source), default_registry), inputs) for source, inputs in corpus]
+
+    def select_all() -> None:
+        for message, inputs in compiled:
+            ctx = FormattingContext(locale=locale, inputs=inputs, registry=default_registry, declarations={})
+            select_pattern(message, ctx)
+
+    return select_all
+
+
+def run(number: int) -> dict[str, float]:
+    results = {}
+    for name, generate in CORPORA.items():
+        corpus = generate()
+        for phase, fn in benchmarks(corpus).items():
+            results[f"{name}/{phase}"] = measure(fn, len(corpus), number)
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    regressions = []
+    for name, value in results.items():
+        if name not in baseline:
+            print(f"{name:<24} {value:>10.1f} us  (new)")
+            continue
+        change = value / baseline[name] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<24} {value:>10.1f} us  {change:>+7.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=10, help="Iterations over the corpus per repeat")
+    parser.add_argument("--save", type=Path, help="Store the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="Compare the results against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = run(args.number)
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+    else:
+        for name, value in results.items():
+            print(f"{name:<24} {value:>10.1f} us")
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
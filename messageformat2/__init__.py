@@ -1,5 +1,6 @@
+from messageformat2.builtins import warm_up
 from messageformat2.message import Message, format_message
 
 
 __version__ = "0.1.1"
-__all__ = ["Message", "format_message"]
+__all__ = ["Message", "format_message", "warm_up"]
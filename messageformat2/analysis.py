@@ -0,0 +1,146 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from messageformat2.datamodel import (
+    Attribute,
+    DataModelVisitor,
+    FunctionAnnotation,
+    InputDeclaration,
+    LocalDeclaration,
+    Message,
+    Node,
+    PatternMessage,
+    SelectMessage,
+    UnsupportedAnnotation,
+    UnsupportedStatement,
+    VariableRef,
+)
+
+
+@dataclass(frozen=True)
+class MessageAnalysis:
+    """Static information about a message, computed without formatting it.
+
+    Examples:
+        >>> from messageformat2 import Message
+        >>> analysis = Message('''\\
+        ... .input {$count :integer}
+        ... .local $unit = {$name :string}
+        ... .match {$count}
+        ... one {{One {$unit}}}
+        ... *   {{{$count} {$unit}s}}''').analysis
+        >>> sorted(analysis.inputs)
+        ['count', 'name']
+        >>> analysis.required_inputs
+        ('count',)
+        >>> sorted(analysis.functions)
+        ['integer', 'string']
+    """
+
+    inputs: frozenset[str]
+    """External variables which the message may read."""
+    required_inputs: tuple[str, ...]
+    """External variables which are read every time the message is formatted, in order of first use."""
+    locals: frozenset[str]
+    """Variables declared with `.local`."""
+    functions: frozenset[str]
+    """Names of the functions used in expressions."""
+    selector_count: int
+    """Number of selectors of the `.match` statement, 0 for pattern messages."""
+    has_unsupported: bool
+    """Whether the message contains unsupported statements or expressions."""
+
+
+class VariableCollector(DataModelVisitor):
+    """Collect the variables referenced by a node in order of appearance.
+
+    Attributes are skipped as they are never resolved.
+    """
+
+    def __init__(self) -> None:
+        self.variables: dict[str, None] = {}
+
+    def visit_VariableRef(self, node: VariableRef) -> None:
+        self.variables[node.name] = None
+
+    def visit_Attribute(self, node: Attribute) -> None:
+        pass
+
+
+class FunctionCollector(DataModelVisitor):
+    """Collect the names of all functions used by a node and whether it contains unsupported syntax."""
+
+    def __init__(self) -> None:
+        self.functions: set[str] = set()
+        self.has_unsupported = False
+
+    def visit_FunctionAnnotation(self, node: FunctionAnnotation) -> None:
+        self.functions.add(node.name)
+        self.generic_visit(node)
+
+    def visit_UnsupportedAnnotation(self, node: UnsupportedAnnotation) -> None:  # noqa: ARG002
+        self.has_unsupported = True
+
+    def visit_UnsupportedStatement(self, node: UnsupportedStatement) -> None:
+        self.has_unsupported = True
+        self.generic_visit(node)
+
+
+def references(nodes: Sequence[Node | str]) -> list[str]:
+    """Return the variables referenced by the nodes in order of appearance."""
+    collector = VariableCollector()
+    for node in nodes:
+        if isinstance(node, Node):
+            collector.visit(node)
+    return list(collector.variables)
+
+
+def analyze(message: Message) -> MessageAnalysis:
+    """Compute the inputs, local variables and functions of a message."""
+    declarations = {}
+    for decl in message.declarations:
+        if isinstance(decl, InputDeclaration | LocalDeclaration):
+            declarations.setdefault(decl.name, decl)
+    local_names = frozenset(name for name, decl in declarations.items() if isinstance(decl, LocalDeclaration))
+
+    collector = VariableCollector()
+    collector.visit(message)
+    inputs = frozenset(name for name in collector.variables if name not in local_names)
+
+    functions = FunctionCollector()
+    functions.visit(message)
+
+    match message:
+        case PatternMessage(pattern=pattern):
+            roots, selector_count = pattern, 0
+        case SelectMessage(selectors=selectors):
+            roots, selector_count = selectors, len(selectors)
+
+    # Follow the declarations used by the pattern (or selectors) to find the
+    # inputs which are always resolved. Variants are chosen at runtime, so
+    # variables only used in some of them are not required.
+    required = {}
+    pending = references(roots)
+    seen = set()
+    while pending:
+        name = pending.pop(0)
+        if name in seen:
+            continue
+        seen.add(name)
+        match declarations.get(name):
+            case LocalDeclaration(value=value):
+                pending[:0] = references([value])
+            case InputDeclaration(value=value):
+                required[name] = None
+                pending[:0] = references([value.annotation]) if value.annotation else []
+            case None:
+                required[name] = None
+
+    return MessageAnalysis(
+        inputs=inputs,
+        required_inputs=tuple(required),
+        locals=local_names,
+        functions=frozenset(functions.functions),
+        selector_count=selector_count,
+        has_unsupported=functions.has_unsupported,
+    )
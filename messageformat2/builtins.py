@@ -1,4 +1,9 @@
 import datetime as _datetime
+import decimal
+import functools
+import math
+import time as _time
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from typing import Any, Literal, Protocol, Self
 
@@ -7,17 +12,48 @@ from babel.dates import format_date as _format_date
 from babel.dates import format_datetime as _format_datetime
 from babel.dates import format_time as _format_time
 from babel.dates import match_skeleton
-from babel.numbers import format_compact_decimal, format_decimal, format_percent, format_scientific
+from babel.numbers import (
+    format_compact_decimal,
+    format_decimal,
+    format_percent,
+    format_scientific,
+    get_group_symbol,
+    parse_pattern,
+)
 
 from messageformat2.errors import InvalidExpression
 
 
+_locales: dict[str | None, Locale] = {}
+
+
+def get_locale(locale: Locale | str | None = None) -> Locale:
+    """Return a `Locale` instance, parsing each locale identifier only once.
+
+    `None` resolves to the system locale which is determined the first time
+    it is requested.
+
+    Examples:
+        >>> get_locale("en_US")
+        Locale('en', territory='US')
+        >>> get_locale("en_US") is get_locale("en_US")
+        True
+    """
+    if isinstance(locale, Locale):
+        return locale
+    try:
+        return _locales[locale]
+    except KeyError:
+        parsed = Locale.default() if locale is None else Locale.parse(locale)
+        return _locales.setdefault(locale, parsed)
+
+
 def format_skeleton(
     skeleton: str,
     dt: _datetime.datetime,
-    locale: Locale,
+    locale: Locale | str,
 ) -> str:
-    locale = Locale.parse(locale)
+    locale = get_locale(locale)
     matched = skeleton
     if skeleton not in locale.datetime_skeletons:
         matched = match_skeleton(
@@ -36,6 +72,47 @@ class Selector(Protocol):
     def __call__(self, value: Any, locale: Locale, options: dict[str, Any], keys: list[str]) -> list[str]: ...
 
 
+type OptionType = Callable[[Any], Any]
+"""Validates and converts a single option value. Raises `InvalidExpression` for invalid values."""
+
+type OptionSchema = dict[str, OptionType]
+"""Maps the names of the options accepted by a function to their types."""
+
+
+def one_of(*choices: str) -> OptionType:
+    """Return an option type which accepts only the given values.
+
+    Examples:
+        >>> one_of("short", "long")("long")
+        'long'
+    """
+
+    def convert(value: Any) -> str:
+        if value not in choices:
+            msg = f"Invalid option value: {value!r}, expected one of: {', '.join(choices)}"
+            raise InvalidExpression(msg)
+        return value
+
+    return convert
+
+
+def digits(value: Any) -> int:
+    """Option type for non-negative integers.
+
+    Examples:
+        >>> digits("2")
+        2
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = -1
+    if number < 0:
+        msg = f"Invalid option value: {value!r}, expected a non-negative integer"
+        raise InvalidExpression(msg)
+    return number
+
+
 def string_formatter(value: Any, locale: Locale, options: dict[str, Any]) -> str:  # noqa: ARG001
     return str(value)
 
@@ -45,6 +122,97 @@ def string_selector(value: Any, locale: Locale, options: dict[str, Any], keys: l
     return [string] if string in keys else []
 
 
+# Integers below this limit are formatted without going through babel.
+# It is well below the 28 digits supported by the default decimal context.
+_FAST_INTEGER_LIMIT = 10**15
+
+
+def _as_integer(number: Any) -> int | None:
+    """Return the number as an int if it can be formatted using the fast path."""
+    if type(number).__module__ == "numpy":
+        # Only types whose str() matches the Python equivalent
+        dtype = getattr(number, "dtype", None)
+        if dtype is None or not (dtype.kind in "iu" or (dtype.kind == "f" and dtype.itemsize == 8)):  # noqa: PLR2004
+            return None
+        number = number.item()
+
+    match number:
+        case bool():
+            return None
+        case int():
+            value = number
+        case float() if number.is_integer() and (number != 0 or math.copysign(1.0, number) > 0):
+            value = int(number)
+        case decimal.Decimal() if number.is_finite() and not (number.is_zero() and number.is_signed()):
+            if number != number.to_integral_value():
+                return None
+            value = int(number)
+        case _:
+            return None
+    return value if -_FAST_INTEGER_LIMIT < value < _FAST_INTEGER_LIMIT else None
+
+
+@functools.lru_cache(maxsize=256)
+def _integer_layout(
+    locale: Locale, style: str, numbering_system: str
+) -> tuple[int, int, tuple[int, int], str, tuple[str, str], tuple[str, str]] | None:
+    """Return the parts of the locale's number pattern needed to render integers.
+
+    Returns None for patterns which the fast path does not handle.
+    """
+    if style == "decimal":
+        pattern = parse_pattern(locale.decimal_formats[None])
+    elif style == "percent":
+        pattern = parse_pattern(locale.percent_formats[None])
+    else:
+        return None
+
+    affixes = "".join(pattern.prefix + pattern.suffix)
+    if (
+        pattern.exp_prec
+        or "@" in pattern.pattern
+        or not pattern.number_pattern
+        or pattern.frac_prec[0]
+        or "'" in affixes
+        or "¤" in affixes
+    ):
+        return None
+    try:
+        symbol = get_group_symbol(locale, numbering_system=numbering_system)
+    except Exception:
+        return None
+    return 10**pattern.scale, pattern.int_prec[0], pattern.grouping, symbol, pattern.prefix, pattern.suffix
+
+
+def _format_integer_fast(
+    number: Any, locale: Locale, *, style: str, numbering_system: str, group_separator: bool
+) -> str | None:
+    """Format integral numbers without converting them to Decimal.
+
+    The output is identical to `format_decimal` and `format_percent`. Returns
+    None if the number or the locale's pattern requires the generic path.
+    """
+    if (value := _as_integer(number)) is None:
+        return None
+    if (layout := _integer_layout(locale, style, numbering_system)) is None:
+        return None
+    scale, min_digits, grouping, symbol, prefix, suffix = layout
+
+    negative = value < 0
+    digits = str(abs(value) * scale)
+    if group_separator:
+        digits = digits.zfill(min_digits)
+        size = grouping[0]
+        groups = []
+        while len(digits) > size:
+            groups.append(digits[-size:])
+            digits = digits[:-size]
+            size = grouping[1]
+        if groups:
+            digits = symbol.join([digits, *reversed(groups)])
+    return prefix[negative] + digits + suffix[negative]
+
+
 def format_number(  # noqa: PLR0913
     number: Any,
     *,
@@ -68,6 +236,11 @@ def format_number(  # noqa: PLR0913
         # babel has 'format_engineering' method..
         return format_scientific(number, locale=locale, numbering_system=numberingSystem)
     group_separator = useGrouping != "never"
+    formatted = _format_integer_fast(
+        number, locale, style=style, numbering_system=numberingSystem, group_separator=group_separator
+    )
+    if formatted is not None:
+        return formatted
     if style == "percent":
         return format_percent(
             number,
@@ -119,6 +292,9 @@ def format_integer(  # noqa: PLR0913
     maximumSignificantDigits: int | None = None,  # noqa: ARG001
     **kwargs,  # noqa: ARG001
 ) -> str:
+    formatted = _format_integer_fast(value, locale, style=style, numbering_system=numberingSystem, group_separator=True)
+    if formatted is not None:
+        return formatted
     if style == "percent":
         return format_percent(
             value,
@@ -251,9 +427,33 @@ def format_datetime(  # noqa: PLR0915, PLR0913
     return format_skeleton(skeleton, dt, locale=locale)
 
 
-def datetime_formatter(value: Any, locale: Locale, options: dict[str, Any]) -> str:
+@functools.lru_cache(maxsize=1024)
+def _parse_isoformat(value: str) -> _datetime.datetime:
+    return _datetime.datetime.fromisoformat(value)
+
+
+def to_datetime(value: Any) -> Any:
+    """Convert ISO 8601 strings and POSIX timestamps to datetime objects.
+
+    Parsed strings are cached as the same timestamps tend to be formatted
+    repeatedly. Timestamps are interpreted as UTC. Other values are returned
+    unchanged.
+
+    Examples:
+        >>> to_datetime("2024-05-10T12:30:00")
+        datetime.datetime(2024, 5, 10, 12, 30)
+        >>> to_datetime(0)
+        datetime.datetime(1970, 1, 1, 0, 0, tzinfo=datetime.timezone.utc)
+    """
     if isinstance(value, str):
-        value = _datetime.datetime.fromisoformat(value)
+        return _parse_isoformat(value)
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return _datetime.datetime.fromtimestamp(value, tz=_datetime.UTC)
+    return value
+
+
+def datetime_formatter(value: Any, locale: Locale, options: dict[str, Any]) -> str:
+    value = to_datetime(value)
     return _format_datetime(value, locale=locale, **options)
 
 
@@ -268,8 +468,7 @@ def format_date(
 
 
 def date_formatter(value: Any, locale: Locale, options: dict[str, Any]) -> str:
-    if isinstance(value, str):
-        value = _datetime.datetime.fromisoformat(value)
+    value = to_datetime(value)
     return format_date(value, locale=locale, **options)
 
 
@@ -284,8 +483,7 @@ def format_time(
 
 
 def time_formatter(value: Any, locale: Locale, options: dict[str, Any]) -> str:
-    if isinstance(value, str):
-        value = _datetime.datetime.fromisoformat(value)
+    value = to_datetime(value)
     if isinstance(value, _datetime.datetime):
         value = value.time()
     return format_time(value, locale=locale, **options)
@@ -295,15 +493,75 @@ def time_formatter(value: Any, locale: Locale, options: dict[str, Any]) -> str:
 class Registry:
     formatters: dict[str, Formatter] = field(default_factory=dict)
     selectors: dict[str, Selector] = field(default_factory=dict)
+    schemas: dict[str, OptionSchema] = field(default_factory=dict)
+    pure: frozenset[str] = frozenset()
+    """Formatters whose output depends only on the value, locale and options.
+
+    Expressions with a literal operand and literal options which use a pure
+    formatter are formatted once per locale instead of on every call.
+    """
 
     def extend(
-        self, *, formatters: dict[str, Formatter] | None = None, selectors: dict[str, Selector] | None = None
+        self,
+        *,
+        formatters: dict[str, Formatter] | None = None,
+        selectors: dict[str, Selector] | None = None,
+        schemas: dict[str, OptionSchema] | None = None,
+        pure: Iterable[str] | None = None,
     ) -> Self:
+        formatters = formatters or {}
+        selectors = selectors or {}
+        # Schemas and purity describe the functions they were registered with, not their replacements
+        inherited = {
+            name: schema for name, schema in self.schemas.items() if name not in formatters and name not in selectors
+        }
         return type(self)(
-            formatters={**self.formatters, **(formatters or {})},
-            selectors={**self.selectors, **(selectors or {})},
+            formatters={**self.formatters, **formatters},
+            selectors={**self.selectors, **selectors},
+            schemas={**inherited, **(schemas or {})},
+            pure=frozenset(name for name in self.pure if name not in formatters).union(pure or ()),
         )
 
+    def coerce_options(self, name: str, options: dict[str, Any]) -> dict[str, Any]:
+        """Validate and convert the options passed to the function `name`.
+
+        Options which are not part of the function's schema are dropped.
+        Functions without a schema receive their options unchanged.
+
+        Raises:
+            InvalidExpression: If an option has an invalid value.
+        """
+        schema = self.schemas.get(name)
+        if schema is None:
+            return options
+        return {key: schema[key](value) for key, value in options.items() if key in schema}
+
+
+_number_schema: OptionSchema = {
+    "compactDisplay": one_of("short", "long"),
+    "notation": one_of("standard", "scientific", "engineering", "compact"),
+    "numberingSystem": str,
+    "signDisplay": one_of("auto", "always", "exceptZero", "negative", "never"),
+    "style": one_of("decimal", "percent"),
+    "useGrouping": one_of("auto", "always", "never", "min2"),
+    "minimumFractionDigits": digits,
+    "maximumFractionDigits": digits,
+    "select": one_of("exact", "plural", "ordinal"),
+}
+
+_integer_schema: OptionSchema = {
+    "numberingSystem": str,
+    "signDisplay": one_of("auto", "always", "exceptZero", "negative", "never"),
+    "style": one_of("decimal", "percent"),
+    "useGrouping": one_of("auto", "always", "min2"),
+    "minimumIntegerDigits": digits,
+    "maximumSignificantDigits": digits,
+    "select": one_of("exact", "plural", "ordinal"),
+}
+
+_style_schema: OptionSchema = {
+    "style": one_of("full", "long", "medium", "short"),
+}
 
 default_registry = Registry(
     formatters={
@@ -319,5 +577,78 @@ default_registry = Registry(
         "number": number_selector,
         "integer": integer_selector,
     },
+    schemas={
+        "string": {},
+        "number": _number_schema,
+        "integer": _integer_schema,
+        "date": _style_schema,
+        "time": _style_schema,
+    },
+    # :datetime converts naive values to the local time zone, so its output is not constant
+    pure=frozenset({"string", "number", "integer", "date", "time"}),
 )
 """The default registry of formatters and selectors."""
+
+
+_warm_up_calls: dict[str, list[tuple[Any, dict[str, Any]]]] = {
+    "string": [("", {})],
+    "number": [
+        (1234.5, {}),
+        (1234.5, {"style": "percent"}),
+        (1234.5, {"notation": "scientific"}),
+        (1234.5, {"notation": "compact"}),
+        (1234.5, {"notation": "compact", "compactDisplay": "long"}),
+    ],
+    "integer": [(1234, {}), (1234, {"style": "percent"})],
+    "datetime": [
+        (_datetime.datetime(2024, 1, 1, 12, 30), {"format": style})  # noqa: DTZ001
+        for style in ("full", "long", "medium", "short")
+    ],
+    "date": [
+        (_datetime.datetime(2024, 1, 1, 12, 30), {"style": style})  # noqa: DTZ001
+        for style in ("full", "long", "medium", "short")
+    ],
+    "time": [(_datetime.time(12, 30), {"style": style}) for style in ("full", "long", "medium", "short")],
+}
+
+
+def warm_up(
+    locales: Iterable[Locale | str],
+    functions: Iterable[str] | None = None,
+    *,
+    registry: Registry = default_registry,
+) -> dict[str, float]:
+    """Preload the locale data used by the builtin functions.
+
+    The first message formatted in a given locale has to load the CLDR data,
+    number and date patterns and plural rules. Call this function on startup
+    to pay that cost upfront instead.
+
+    Examples:
+        >>> timings = warm_up(["en", "cs"], functions=["number", "date"])
+        >>> sorted(timings)
+        ['cs', 'en']
+
+    Args:
+        locales: The locales to warm up.
+        functions: Names of the functions to warm up. Defaults to all builtin functions in the registry.
+        registry: The registry whose functions should be warmed up.
+
+    Returns:
+        A mapping from each locale to the number of seconds it took to warm it up.
+    """
+    names = list(registry.formatters.keys() | registry.selectors.keys() if functions is None else functions)
+    timings = {}
+    for locale in locales:
+        start = _time.perf_counter()
+        parsed = get_locale(locale)
+        parsed.plural_form(1)
+        parsed.ordinal_form(1)
+        for name in names:
+            for value, options in _warm_up_calls.get(name, []):
+                if formatter := registry.formatters.get(name):
+                    formatter(value, locale=parsed, options=options)
+                if selector := registry.selectors.get(name):
+                    selector(value, locale=parsed, options=options, keys=[])
+        timings[str(locale)] = _time.perf_counter() - start
+    return timings
@@ -0,0 +1,138 @@
+import json
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+
+import messageformat2
+from messageformat2.builtins import default_registry
+from messageformat2.errors import MessageFormatError, ParseError
+from messageformat2.message import Message
+from messageformat2.parser import parse
+from messageformat2.runtime import check_options
+
+
+type Catalog[T] = dict[str, dict[str, T]]
+"""Messages grouped by locale and message id."""
+
+
+@dataclass
+class CatalogError:
+    """An error in a single message of a catalog."""
+
+    locale: str
+    id: str
+    error: MessageFormatError
+
+    @property
+    def position(self) -> int | None:
+        """The position of a syntax error within the message."""
+        return self.error.position if isinstance(self.error, ParseError) else None
+
+    def __str__(self) -> str:
+        location = f"{self.locale}:{self.id}" if self.position is None else f"{self.locale}:{self.id}:{self.position}"
+        return f"{location}: {type(self.error).__name__}: {self.error}"
+
+
+def read_catalog(path: Path) -> Catalog[str]:
+    """Read message sources from JSON files.
+
+    Each file maps message ids to messages and its name (without the
+    extension) is the locale of the messages, e.g. `en_US.json`. The path can
+    either be a single file or a directory containing such files.
+
+    Args:
+        path: The catalog file or directory.
+
+    Returns:
+        The messages grouped by locale and message id.
+
+    Raises:
+        ValueError: If a file is not valid JSON or does not map message ids to strings.
+    """
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    catalog = {}
+    for file in files:
+        try:
+            with file.open(encoding="utf-8") as f:
+                messages = json.load(f)
+        except ValueError as e:
+            msg = f"{file}: invalid JSON: {e}"
+            raise ValueError(msg) from e
+        if not isinstance(messages, dict):
+            msg = f"{file}: expected an object mapping message ids to messages, got {type(messages).__name__}"
+            raise ValueError(msg)  # noqa: TRY004
+        for msg_id, source in messages.items():
+            if not isinstance(source, str):
+                msg = f"{file}: message {msg_id!r} must be a string, got {type(source).__name__}"
+                raise ValueError(msg)  # noqa: TRY004
+        catalog[file.stem] = messages
+    return catalog
+
+
+def parse_catalog(catalog: Catalog[str]) -> tuple[Catalog[Message], list[CatalogError]]:
+    """Parse all messages in a catalog.
+
+    Unlike constructing the messages one by one, this does not stop at the
+    first invalid message. Literal options of the builtin functions are
+    checked too, including those of declarations and variants which are not
+    always evaluated, as they would fail to format when they are.
+
+    Returns:
+        The parsed messages and the errors of all messages which could not be parsed.
+    """
+    messages = {}
+    errors = []
+    for locale, sources in catalog.items():
+        messages[locale] = {}
+        for msg_id, source in sources.items():
+            try:
+                message = Message(source)
+                check_options(message.datamodel, default_registry)
+                messages[locale][msg_id] = message
+            except MessageFormatError as e:
+                errors.append(CatalogError(locale=locale, id=msg_id, error=e))
+    return messages, errors
+
+
+def validate_message(item: tuple[str, str, str]) -> CatalogError | None:
+    """Check that a `(locale, id, message)` triple can be parsed and that its literal options are valid."""
+    locale, msg_id, source = item
+    try:
+        check_options(parse(source), default_registry)
+    except MessageFormatError as e:
+        return CatalogError(locale=locale, id=msg_id, error=e)
+    return None
+
+
+def save_catalog(path: Path, messages: Catalog[Message]) -> None:
+    """Save parsed messages so that they can be loaded without parsing them again.
+
+    Args:
+        path: The file to write.
+        messages: The messages grouped by locale and message id.
+    """
+    data = {"version": messageformat2.__version__, "messages": messages}
+    with path.open("wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_catalog(path: Path) -> Catalog[Message]:
+    """Load messages saved by `save_catalog` (or the `compile` command).
+
+    The file is unpickled so only load catalogs from trusted sources.
+
+    Args:
+        path: The compiled catalog.
+
+    Returns:
+        The messages grouped by locale and message id.
+
+    Raises:
+        ValueError: If the catalog was compiled by a different version of messageformat2.
+    """
+    with path.open("rb") as f:
+        data = pickle.load(f)  # noqa: S301
+    if data.get("version") != messageformat2.__version__:
+        msg = f"Catalog was compiled with messageformat2 {data.get('version')}, expected {messageformat2.__version__}"
+        raise ValueError(msg)
+    return data["messages"]
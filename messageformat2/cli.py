@@ -1,11 +1,149 @@
 import ast
+import functools
 import hashlib
+import itertools
+import json
+import mmap
+import os
+import re
+import statistics
+import time
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
 import click
+from babel import UnknownLocaleError
 
 import messageformat2
+from messageformat2.catalog import Catalog, load_catalog, parse_catalog, read_catalog, save_catalog, validate_message
+from messageformat2.errors import MessageFormatError
+from messageformat2.message import Message
+from messageformat2.parser import parse
+
+
+class MessageExtractor(ast.NodeVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages = []
+
+    def visit_Call(self, node: ast.Call) -> None:
+        match node:
+            case ast.Call(func=ast.Name(id="_"), args=[ast.Constant(value=message), *_]):
+                self.messages.append(message)
+        self.generic_visit(node)
+
+
+def extract_messages(source: str | bytes) -> list[str]:
+    """Return all messages passed to `_()` in Python source code."""
+    extractor = MessageExtractor()
+    extractor.visit(ast.parse(source))
+    return extractor.messages
+
+
+def _map_chunk(fn: Any, chunk: tuple[Any, ...]) -> list[Any]:
+    return [fn(item) for item in chunk]
+
+
+def parallel_map(fn: Any, items: Iterable[Any], jobs: int, chunksize: int = 16) -> Iterator[Any]:
+    """Apply `fn` to each item, using `jobs` processes.
+
+    Results are yielded as soon as they are available but always in the
+    order of `items`. Items are submitted in chunks of `chunksize` and at
+    most two chunks per process are pending at any time, so `items` can be
+    arbitrarily large.
+    """
+    if jobs == 1:
+        yield from map(fn, items)
+        return
+    chunks = itertools.batched(items, chunksize)
+    with ProcessPoolExecutor(jobs) as executor:
+        pending = deque(executor.submit(_map_chunk, fn, chunk) for chunk in itertools.islice(chunks, jobs * 2))
+        while pending:
+            results = pending.popleft().result()
+            pending.extend(executor.submit(_map_chunk, fn, chunk) for chunk in itertools.islice(chunks, 1))
+            yield from results
+
+
+# Files not matching this cannot contain a call to `_()`
+_call_marker = re.compile(rb"_[\s\\]*\(")
+
+EXTRACT_CACHE_VERSION = 1
+
+
+def load_extract_cache(path: Path | None) -> dict[str, dict[str, Any]]:
+    """Load the extraction cache, returning an empty cache if it is missing or outdated."""
+    if path is None or not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != EXTRACT_CACHE_VERSION:
+        return {}
+    files = data.get("files")
+    if not isinstance(files, dict) or not all(
+        isinstance(entry, dict) and {"size", "mtime", "sha256", "messages"} <= entry.keys() for entry in files.values()
+    ):
+        return {}
+    return files
+
+
+def save_extract_cache(path: Path, files: dict[str, dict[str, Any]]) -> None:
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps({"version": EXTRACT_CACHE_VERSION, "files": files}))
+    tmp.replace(path)
+
+
+def is_unchanged(path: Path, entry: dict[str, Any] | None) -> bool:
+    if entry is None:
+        return False
+    stat = path.stat()
+    return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns
+
+
+def extract_file(item: tuple[Path, dict[str, Any] | None]) -> tuple[dict[str, Any], str]:
+    """Extract messages from a file, reusing the cache entry if the content did not change.
+
+    Files which do not contain the `_(` marker are skipped without being decoded or parsed.
+
+    Returns the new cache entry for the file and whether the file was "parsed",
+    "skipped" or its messages were "cached".
+    """
+    path, entry = item
+    with path.open("rb") as f:
+        stat = os.fstat(f.fileno())
+        # Empty files cannot be memory-mapped
+        source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        digest = hashlib.sha256(source).hexdigest()
+        if entry and entry["sha256"] == digest:
+            messages, status = entry["messages"], "cached"
+        elif not _call_marker.search(source):
+            messages, status = [], "skipped"
+        else:
+            messages, status = extract_messages(source[:]), "parsed"
+        if isinstance(source, mmap.mmap):
+            source.close()
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": digest, "messages": messages}, status
+
+
+def extract_files(
+    files: list[Path], jobs: int, cache: dict[str, dict[str, Any]]
+) -> Iterator[tuple[str, dict[str, Any], str]]:
+    """Yield the cache key, cache entry and status for each file, in order.
+
+    Only files whose size or modification time changed since they were cached are read.
+    """
+    keys = [os.fspath(f.resolve()) for f in files]
+    stale = {
+        key: (f, cache.get(key)) for f, key in zip(files, keys, strict=True) if not is_unchanged(f, cache.get(key))
+    }
+    extracted = parallel_map(extract_file, stale.values(), jobs)
+    for key in keys:
+        entry, status = next(extracted) if key in stale else (cache[key], "cached")
+        yield key, entry, status
 
 
 @click.group(invoke_without_command=True)
@@ -21,31 +159,288 @@ def cli(ctx: Any, version: bool) -> None:  # noqa: FBT001
 
 @cli.command()
 @click.argument("filename", type=click.Path(exists=True))
-def extract(filename: Path) -> None:
+@click.option("--jobs", "-j", type=click.IntRange(min=1), default=1, help="Number of processes to use.")
+@click.option(
+    "--cache",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Cache file used to skip files which did not change since the previous run.",
+)
+@click.option("--stats", is_flag=True, help="Print the number of parsed, skipped and cached files to stderr.")
+def extract(filename: Path, jobs: int, cache: Path | None, stats: bool) -> None:  # noqa: FBT001
     """Extract messages."""
     filename = Path(filename)
+    files = sorted(filename.rglob("*.py")) if filename.is_dir() else [filename]
 
-    class MessageExtractor(ast.NodeVisitor):
-        def __init__(self) -> None:
-            super().__init__()
-            self.messages = []
+    entries = {}
+    counts = Counter()
+    for key, entry, status in extract_files(files, jobs, load_extract_cache(cache)):
+        entries[key] = entry
+        counts[status] += 1
+        for message in entry["messages"]:
+            msg_id = hashlib.sha256(message.encode()).hexdigest()
+            click.echo(f"{msg_id} = {message}\n")
+    click.echo()
 
-        def visit_Call(self, node: ast.Call) -> None:
-            match node:
-                case ast.Call(func=ast.Name(id="_"), args=[ast.Constant(value=message), *_]):
-                    self.messages.append(message)
-            self.generic_visit(node)
+    if cache is not None:
+        save_extract_cache(cache, entries)
+    if stats:
+        click.echo(f"parsed: {counts['parsed']}, skipped: {counts['skipped']}, cached: {counts['cached']}", err=True)
 
-    files = filename.rglob("*.py") if filename.is_dir() else [filename]
 
-    extractor = MessageExtractor()
-    for f in files:
-        source = f.read_text()
-        tree = ast.parse(source)
-        extractor.visit(tree)
-
-    output = ""
-    for message in extractor.messages:
-        msg_id = hashlib.sha256(message.encode()).hexdigest()
-        output += f"{msg_id} = {message}\n\n"
-    click.echo(output)
+def read_sources(path: Path) -> Catalog[str]:
+    """Read a JSON catalog, reporting an invalid file as an error of the command."""
+    try:
+        return read_catalog(path)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+
+@cli.command("compile")
+@click.argument("catalog", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    required=True,
+    help="The compiled catalog file to write.",
+)
+def compile_(catalog: Path, output: Path) -> None:
+    """Compile a catalog of messages.
+
+    CATALOG is a JSON file mapping message ids to messages, named after the
+    locale of the messages (e.g. en_US.json), or a directory of such files.
+    The compiled catalog can be loaded with messageformat2.catalog.load_catalog.
+    """
+    messages, errors = parse_catalog(read_sources(catalog))
+    for error in errors:
+        click.echo(str(error), err=True)
+    if errors:
+        msg = f"{len(errors)} invalid message(s), {output} was not written"
+        raise click.ClickException(msg)
+
+    save_catalog(output, messages)
+    count = sum(len(msgs) for msgs in messages.values())
+    click.echo(f"Compiled {count} message(s) in {len(messages)} locale(s) to {output}")
+
+
+@cli.command()
+@click.argument("catalog", type=click.Path(exists=True, path_type=Path))
+@click.option("--jobs", "-j", type=click.IntRange(min=1), default=1, help="Number of processes to use.")
+def validate(catalog: Path, jobs: int) -> None:
+    """Check that all messages in a catalog are valid.
+
+    CATALOG uses the same format as for the compile command. Every invalid
+    message is reported as LOCALE:ID[:POSITION]: ERROR.
+    """
+    sources = read_sources(catalog)
+    items = [(locale, msg_id, source) for locale, messages in sources.items() for msg_id, source in messages.items()]
+    chunksize = max(1, min(1024, len(items) // (jobs * 4)))
+
+    errors = 0
+    for error in parallel_map(validate_message, items, jobs, chunksize=chunksize):
+        if error is not None:
+            errors += 1
+            click.echo(str(error), err=True)
+
+    summary = f"{len(items)} message(s) in {len(sources)} locale(s), {errors} invalid"
+    if errors:
+        raise click.ClickException(summary)
+    click.echo(summary)
+
+
+def read_inputs(path: Path | None) -> dict[str, list[dict[str, Any]]]:
+    """Read sample inputs for messages.
+
+    A JSON file maps message ids to an inputs object or a list of them. A JSONL
+    file contains one `{"id": ..., "inputs": {...}}` record per line.
+    """
+    if path is None:
+        return {}
+    samples = {}
+    if path.suffix == ".jsonl":
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    samples.setdefault(record["id"], []).append(record.get("inputs") or {})
+        return samples
+    with path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    return {msg_id: inputs if isinstance(inputs, list) else [inputs] for msg_id, inputs in data.items()}
+
+
+def measure(fn: Any, iterations: int) -> list[int]:
+    """Return the duration of each call in nanoseconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        timings.append(time.perf_counter_ns() - start)
+    return timings
+
+
+def percentiles(timings: list[int]) -> tuple[float, float, float]:
+    """Return the 50th, 95th and 99th percentile."""
+    if len(timings) == 1:
+        timing = float(timings[0])
+        return timing, timing, timing
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+@cli.command()
+@click.argument("catalog", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--inputs",
+    "inputs_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="JSON or JSONL file with sample inputs for each message id.",
+)
+@click.option("--locale", "-l", "locales", multiple=True, help="Only benchmark these locales of the catalog.")
+@click.option("--iterations", "-n", type=click.IntRange(min=1), default=1000, help="Number of calls per measurement.")
+def bench(catalog: Path, inputs_path: Path | None, locales: tuple[str, ...], iterations: int) -> None:
+    """Measure parsing and formatting performance of a catalog.
+
+    CATALOG uses the same format as for the compile command. Latencies are
+    reported in microseconds, formatting throughput in calls per second.
+    """
+    sources = read_sources(catalog)
+    samples = read_inputs(inputs_path)
+    if locales:
+        sources = {locale: sources[locale] for locale in locales if locale in sources}
+
+    click.echo(f"{'locale':<10} {'id':<24} {'parse p50':>10} {'format/s':>10} {'p50':>8} {'p95':>8} {'p99':>8}")
+    total_calls = total_ns = 0
+    for locale, messages in sources.items():
+        for msg_id, source in messages.items():
+            try:
+                parse_timings = measure(lambda source=source: parse(source), iterations)
+                message = Message(source)
+                format_timings = []
+                for inputs in samples.get(msg_id, [{}]):
+                    fn = functools.partial(message.format, inputs, locale)
+                    # The first call compiles the message and loads the locale data, keep it out of the timings
+                    fn()
+                    format_timings += measure(fn, iterations)
+            except Exception as e:
+                # Report the failure of a single message, e.g. an unknown locale, and go on with the others
+                click.echo(f"{locale:<10} {msg_id:<24} {type(e).__name__}: {e}")
+                continue
+
+            parse_p50 = percentiles(parse_timings)[0]
+            p50, p95, p99 = percentiles(format_timings)
+            throughput = len(format_timings) / (sum(format_timings) / 1e9)
+            total_calls += len(format_timings)
+            total_ns += sum(format_timings)
+            click.echo(
+                f"{locale:<10} {msg_id:<24} {parse_p50 / 1e3:>10.1f} {throughput:>10.0f} "
+                f"{p50 / 1e3:>8.1f} {p95 / 1e3:>8.1f} {p99 / 1e3:>8.1f}"
+            )
+    if total_calls:
+        click.echo(f"Total: {total_calls} format calls, {total_calls / (total_ns / 1e9):.0f} calls/s")
+
+
+def open_catalog(path: Path) -> Catalog[Message]:
+    """Load a compiled catalog or parse a JSON catalog."""
+    if not path.is_dir() and path.suffix != ".json":
+        return load_catalog(path)
+    messages, errors = parse_catalog(read_sources(path))
+    if errors:
+        msg = f"The catalog contains {len(errors)} invalid message(s), use the validate command to list them"
+        raise click.ClickException(msg)
+    return messages
+
+
+class RecordFormatter:
+    """Format JSON records of the form `{"id"/"message": ..., "locale": ..., "inputs": {...}}`."""
+
+    def __init__(self, catalog: Catalog[Message] | None, locale: str | None) -> None:
+        self.catalog = catalog or {}
+        self.locale = locale
+        # Reuse parsed messages when the same message is formatted repeatedly
+        self.parse = functools.lru_cache(maxsize=1024)(Message)
+
+    def get_message(self, record: dict[str, Any], locale: str | None) -> Message:
+        if "message" in record:
+            return self.parse(record["message"])
+        messages = self.catalog.get(locale, {}) if locale is not None else {}
+        try:
+            return messages[record["id"]]
+        except (KeyError, TypeError):
+            msg = f"Unknown message: {record.get('id')} ({locale})"
+            raise LookupError(msg) from None
+
+    @staticmethod
+    def read_record(line: str) -> dict[str, Any]:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            msg = f"Expected a JSON object, got: {line.strip()}"
+            raise ValueError(msg)  # noqa: TRY004
+        if not isinstance(record.get("locale"), str | None):
+            msg = f"Invalid locale, expected a string: {record['locale']!r}"
+            raise ValueError(msg)  # noqa: TRY004
+        if not isinstance(record.get("inputs"), dict | None):
+            msg = f"Invalid inputs, expected a JSON object: {record['inputs']!r}"
+            raise ValueError(msg)  # noqa: TRY004
+        if not isinstance(record.get("message", ""), str):
+            msg = f"Invalid message, expected a string: {record['message']!r}"
+            raise ValueError(msg)  # noqa: TRY004
+        return record
+
+    def __call__(self, line: str) -> str:
+        result = {}
+        try:
+            record = self.read_record(line)
+            if "id" in record:
+                result["id"] = record["id"]
+            locale = record.get("locale", self.locale)
+            message = self.get_message(record, locale)
+            result["output"] = message.format(record.get("inputs"), locale)
+        except (MessageFormatError, LookupError, ValueError, UnknownLocaleError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return json.dumps(result, ensure_ascii=False)
+
+
+_record_formatter: RecordFormatter | None = None
+
+
+def _init_record_formatter(catalog: Catalog[Message] | None, locale: str | None) -> None:
+    global _record_formatter  # noqa: PLW0603
+    _record_formatter = RecordFormatter(catalog, locale)
+
+
+def _format_record(line: str) -> str:
+    assert _record_formatter is not None
+    return _record_formatter(line)
+
+
+@cli.command("format")
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True, path_type=Path),
+    help="Compiled or JSON catalog used to look up records by id.",
+)
+@click.option("--locale", "-l", help="Locale for records which do not specify one. Defaults to the system locale.")
+@click.option("--jobs", "-j", type=click.IntRange(min=1), default=1, help="Number of processes to use.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=512, help="Number of records read at once per job.")
+def format_(catalog: Path | None, locale: str | None, jobs: int, batch_size: int) -> None:
+    """Format JSONL records read from stdin.
+
+    Each record contains either a "message" or the "id" of a message in the
+    catalog, and optionally a "locale" and "inputs". A record with the
+    "output" or the "error" is written to stdout for each input record, in
+    the same order.
+    """
+    messages = open_catalog(catalog) if catalog else None
+    lines = (line for line in click.get_text_stream("stdin") if line.strip())
+    if jobs == 1:
+        _init_record_formatter(messages, locale)
+        for line in lines:
+            click.echo(_format_record(line))
+        return
+
+    with ProcessPoolExecutor(jobs, initializer=_init_record_formatter, initargs=(messages, locale)) as executor:
+        # Only a bounded number of records is held in memory at any time
+        for batch in itertools.batched(lines, batch_size * jobs):
+            for output in executor.map(_format_record, batch, chunksize=batch_size):
+                click.echo(output)
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import Any
 from typing import Literal as TypingLiteral
@@ -203,6 +204,20 @@ class Markup(Node):
 type Pattern = list[str | Expression | Markup]
 
 
+def merge_text(parts: Iterable[str | Expression | Markup]) -> Pattern:
+    """Merge adjacent text parts of a pattern and drop empty ones."""
+    merged: Pattern = []
+    for part in parts:
+        if isinstance(part, str):
+            if not part:
+                continue
+            if merged and isinstance(merged[-1], str):
+                merged[-1] += part
+                continue
+        merged.append(part)
+    return merged
+
+
 @dataclass
 class CatchallKey(Node):
     value: str | None
@@ -425,26 +440,36 @@ class DataModelValidator(DataModelVisitor):
         self._check_implicit_redeclaration(declarations)
 
     def _check_missing_selector_annotation(self, selectors: list[Expression], declarations: list[Declaration]) -> None:
+        by_name = {}
+        for decl in declarations:
+            if not isinstance(decl, UnsupportedStatement):
+                by_name.setdefault(decl.name, decl)
+
         for selector in selectors:
-            if not self._is_annotated(selector, declarations):
+            if not self._is_annotated(selector, by_name):
                 msg = "Missing selector annotation"
                 raise MissingSelectorAnnotation(msg)
 
-    def _is_annotated(self, selector: Expression, declarations: list[Declaration]) -> bool:
-        match selector:
-            case LiteralExpression(annotation=None):
-                return False
-            case VariableExpression(annotation=None, arg=VariableRef(name=name)):
-                for decl in declarations:
-                    if isinstance(decl, UnsupportedStatement) or decl.name != name:
-                        continue
-                    match decl:
+    def _is_annotated(self, selector: Expression, declarations: dict[str, InputDeclaration | LocalDeclaration]) -> bool:
+        # Follow chains of local declarations iteratively so that long (or
+        # circular) chains cannot exhaust the recursion limit.
+        seen = set()
+        expression = selector
+        while True:
+            match expression:
+                case LiteralExpression(annotation=None):
+                    return False
+                case VariableExpression(annotation=None, arg=VariableRef(name=name)):
+                    if name in seen or name not in declarations:
+                        return False
+                    seen.add(name)
+                    match declarations[name]:
                         case InputDeclaration(value=VariableExpression(annotation=annotation)):
                             return annotation is not None
-                        case _:
-                            return self._is_annotated(decl.value, declarations)
-                return False
-        return True
+                        case LocalDeclaration(value=value):
+                            expression = value
+                case _:
+                    return True
 
     def _check_variant_key_mismatch(self, selectors: list[Expression], variants: list[Variant]) -> None:
         for variant in variants:
@@ -16,6 +16,21 @@ class ParseError(MessageFormatError):
         messageformat2.errors.ParseError: ...
     """
 
+    position: int | None = None
+    """Index of the character in the message at which the error was detected."""
+
+
+class MessageTooLarge(ParseError):
+    """Raised when a message exceeds the size limit passed to the parser.
+
+    Examples:
+        >>> from messageformat2 import Message
+        >>> Message("Hello, {$name}!", max_length=8) # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        messageformat2.errors.MessageTooLarge: ...
+    """
+
 
 class DataModelError(MessageFormatError):
     """Base class for all messageformat2 data model errors."""
@@ -0,0 +1,250 @@
+"""Opt-in timing of messages, formatters and selectors.
+
+Instrumentation is disabled by default. Enabling it wraps `Message.format`,
+`LazyValue.format` and `LazyValue.select` and disabling it restores the
+original methods, so there is no overhead unless it is enabled. While it is
+enabled, constant placeholders are formatted on every call instead of once
+per locale so that every formatter call is timed.
+
+`measure_allocations` measures the memory allocated by a single call instead.
+"""
+
+import statistics
+import threading
+import time
+import tracemalloc
+import warnings
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from messageformat2.message import Message
+from messageformat2.runtime import FormattingContext, LazyValue
+
+
+type EventKind = Literal["message", "formatter", "selector"]
+
+SAMPLE_SIZE = 1024
+"""Number of most recent durations per name used to compute percentiles."""
+
+MAX_NAMES = 10_000
+"""Maximum number of messages, formatters and selectors tracked each.
+
+Messages are tracked by their source, so formatting many distinct messages
+would otherwise grow the timings without bound. Calls of further names are
+not recorded until `reset` is called, the callback still receives them.
+"""
+
+
+@dataclass(frozen=True)
+class Event:
+    """A single timed call passed to the instrumentation callback."""
+
+    kind: EventKind
+    """What was called: a whole message, a formatter or a selector."""
+    name: str
+    """The message source or the function name."""
+    duration: float
+    """Duration of the call in seconds."""
+
+
+@dataclass(frozen=True)
+class Timing:
+    """Aggregated timings of a message or function. Durations are in seconds."""
+
+    count: int
+    total: float
+    p50: float
+    p95: float
+    p99: float
+
+
+@dataclass(frozen=True)
+class Stats:
+    """A snapshot of the timings collected since instrumentation was enabled or reset."""
+
+    messages: dict[str, Timing]
+    formatters: dict[str, Timing]
+    selectors: dict[str, Timing]
+
+
+class _Series:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.samples.append(duration)
+
+    def timing(self) -> Timing:
+        samples = list(self.samples)
+        if len(samples) == 1:
+            p50 = p95 = p99 = samples[0]
+        else:
+            cuts = statistics.quantiles(samples, n=100, method="inclusive")
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        return Timing(count=self.count, total=self.total, p50=p50, p95=p95, p99=p99)
+
+
+_lock = threading.Lock()
+_series: dict[EventKind, dict[str, _Series]] = {"message": {}, "formatter": {}, "selector": {}}
+_callback: Callable[[Event], None] | None = None
+_originals: dict[str, Any] = {}
+
+
+def _record(kind: EventKind, name: str, duration: float) -> None:
+    with _lock:
+        by_name = _series[kind]
+        series = by_name.get(name)
+        if series is None and len(by_name) < MAX_NAMES:
+            series = by_name[name] = _Series()
+        if series is not None:
+            series.add(duration)
+    if _callback is not None:
+        try:
+            _callback(Event(kind=kind, name=name, duration=duration))
+        except Exception as e:
+            # Instrumentation must never change the outcome of formatting
+            warnings.warn(f"Instrumentation callback failed: {e!r}", RuntimeWarning, stacklevel=2)
+
+
+def _timed_message_format(self: Message, *args: Any, **kwargs: Any) -> str:
+    start = time.perf_counter()
+    try:
+        return _originals["Message.format"](self, *args, **kwargs)
+    finally:
+        _record("message", self.msg, time.perf_counter() - start)
+
+
+def _timed_format(self: LazyValue, ctx: FormattingContext) -> str:
+    start = time.perf_counter()
+    try:
+        return _originals["LazyValue.format"](self, ctx)
+    finally:
+        _record("formatter", self.fn_name, time.perf_counter() - start)
+
+
+def _timed_select(self: LazyValue, ctx: FormattingContext, *, keys: list[str]) -> list[str]:
+    start = time.perf_counter()
+    try:
+        return _originals["LazyValue.select"](self, ctx, keys=keys)
+    finally:
+        _record("selector", self.fn_name, time.perf_counter() - start)
+
+
+def enable(callback: Callable[[Event], None] | None = None) -> None:
+    """Start collecting timings.
+
+    Examples:
+        >>> from messageformat2 import Message, instrumentation
+        >>> instrumentation.enable()
+        >>> Message("{42 :number}").format(locale="en")
+        '42'
+        >>> instrumentation.stats().formatters["number"].count
+        1
+        >>> instrumentation.disable()
+
+    Args:
+        callback: Called with an `Event` after every timed call. Calling
+            `enable` again replaces the callback. Exceptions raised by the
+            callback are turned into a `RuntimeWarning`.
+    """
+    global _callback  # noqa: PLW0603
+    _callback = callback
+    if _originals:
+        return
+    _originals["Message.format"] = Message.format
+    _originals["LazyValue.format"] = LazyValue.format
+    _originals["LazyValue.select"] = LazyValue.select
+    Message.format = _timed_message_format
+    Message._fold_constants = False  # noqa: SLF001
+    LazyValue.format = _timed_format
+    LazyValue.select = _timed_select
+
+
+def disable() -> None:
+    """Stop collecting timings and remove the instrumentation.
+
+    Collected timings are kept until `reset` is called.
+    """
+    global _callback  # noqa: PLW0603
+    _callback = None
+    if not _originals:
+        return
+    Message.format = _originals.pop("Message.format")
+    Message._fold_constants = True  # noqa: SLF001
+    LazyValue.format = _originals.pop("LazyValue.format")
+    LazyValue.select = _originals.pop("LazyValue.select")
+
+
+def is_enabled() -> bool:
+    """Return whether instrumentation is enabled."""
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Discard all collected timings.
+
+    Call this periodically when formatting many distinct messages, see `MAX_NAMES`.
+    """
+    with _lock:
+        for series in _series.values():
+            series.clear()
+
+
+def stats() -> Stats:
+    """Return a snapshot of the collected timings."""
+    with _lock:
+        return Stats(
+            messages={name: series.timing() for name, series in _series["message"].items()},
+            formatters={name: series.timing() for name, series in _series["formatter"].items()},
+            selectors={name: series.timing() for name, series in _series["selector"].items()},
+        )
+
+
+@dataclass(frozen=True)
+class Allocations:
+    """Memory allocated by a single call, measured with tracemalloc."""
+
+    blocks: int
+    """Number of memory blocks still allocated after the call, including its result."""
+    size: int
+    """Size in bytes of the blocks still allocated after the call."""
+    peak: int
+    """Peak size in bytes of all memory allocated during the call."""
+
+
+def measure_allocations(fn: Callable[[], object]) -> Allocations:
+    """Measure the memory allocated by a call of `fn`.
+
+    The function is called once before measuring so that caches are warm and
+    only per-call allocations are counted.
+
+    Examples:
+        >>> allocations = measure_allocations(lambda: [0] * 1000)
+        >>> allocations.size >= 8000
+        True
+    """
+    fn()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    ignore = [tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "filename")
+    return Allocations(
+        blocks=sum(stat.count_diff for stat in stats),
+        size=sum(stat.size_diff for stat in stats),
+        peak=peak - start,
+    )
@@ -2,19 +2,23 @@ from typing import Any
 
 from babel import Locale
 
-from messageformat2.builtins import Formatter, Selector, default_registry
-from messageformat2.datamodel import Node
+from messageformat2.analysis import MessageAnalysis, analyze
+from messageformat2.builtins import Formatter, Registry, Selector, default_registry, get_locale
+from messageformat2.datamodel import Message as _Message
+from messageformat2.errors import FormatError, UnresolvedVariable
 from messageformat2.parser import parse
+from messageformat2.runtime import compile_message, fold_constants
 from messageformat2.runtime import format_message as _format_message
 
 
-def format_message(
+def format_message(  # noqa: PLR0913
     msg: str,
     inputs: dict[str, Any] | None = None,
     locale: Locale | str | None = None,
     *,
     formatters: dict[str, Formatter] | None = None,
     selectors: dict[str, Selector] | None = None,
+    errors: list[FormatError] | None = None,
 ) -> str:
     """Format a message.
 
@@ -37,6 +41,8 @@ def format_message(
         inputs: Input variables referenced by the message.
         formatters: Additional formatters.
         selectors: Additional selectors.
+        errors: If given, formatting errors are appended to this list instead
+            of being raised. See `Message.format`.
 
     Returns:
         The formatted message.
@@ -46,11 +52,14 @@ def format_message(
         DataModelError: If the message contains a semantic error.
         FormatError: If the message cannot be formatted.
     """
-    return Message(msg).format(inputs, locale, formatters=formatters, selectors=selectors)
+    return Message(msg).format(inputs, locale, formatters=formatters, selectors=selectors, errors=errors)
 
 
 class Message:
-    def __init__(self, msg: str):
+    _fold_constants = True
+    """Whether to format constant placeholders once per locale, disabled by instrumentation."""
+
+    def __init__(self, msg: str, *, max_length: int | None = None, optimize: bool = False):
         """Create a new Message object that can be formatted.
 
         Use this class if you need to format the same message multiple times as
@@ -58,13 +67,21 @@ class Message:
 
         Args:
             msg: The message.
+            max_length: Maximum length of the message in characters. Set this
+                when parsing untrusted messages to bound the parsing time.
+            optimize: Simplify the data model before formatting, see
+                `messageformat2.optimizer.MessageOptimizer`. The formatted
+                output is the same but `datamodel` no longer mirrors the source.
 
         Raises:
             ParseError: If the message contains a syntax error.
+            MessageTooLarge: If the message is longer than `max_length`.
             DataModelError: If the message contains a semantic error.
         """
         self.msg = msg
-        self._ast = parse(msg)
+        self._ast = parse(msg, max_length=max_length, optimize=optimize)
+        self._compiled: tuple[Registry, _Message, dict[Locale, _Message]] | None = None
+        self._analysis: MessageAnalysis | None = None
 
     def format(
         self,
@@ -73,6 +90,7 @@ class Message:
         *,
         formatters: dict[str, Formatter] | None = None,
         selectors: dict[str, Selector] | None = None,
+        errors: list[FormatError] | None = None,
     ) -> str:
         """Format the message.
 
@@ -86,23 +104,31 @@ class Message:
             ... *   {{You have {$count} notifications}}''')
             >>> message.format({"count": 3}, "en")
             'You have 3 notifications'
+            >>> errors = []
+            >>> Message("Hello, {$name}!").format(errors=errors)
+            'Hello, {$name}!'
+            >>> errors
+            [UnresolvedVariable('Unresolved variable: name')]
 
         Args:
             locale: The locale in which to format the message. Defaults to the system locale.
             inputs: Input variables referenced by the message.
             formatters: Additional formatters.
             selectors: Additional selectors.
+            errors: If given, formatting is not strict: errors are appended to
+                this list instead of being raised and the parts of the message
+                which cannot be formatted are replaced by their fallback
+                representation, such as `{$name}` for a missing variable.
 
         Returns:
             The formatted message.
 
         Raises:
-            FormatError: If the message cannot be formatted.
+            FormatError: If the message cannot be formatted, for example if a
+                function is given an invalid option. Only raised if `errors`
+                is not given.
         """
-        if locale is None:
-            locale = Locale.default()
-        elif not isinstance(locale, Locale):
-            locale = Locale.parse(locale)
+        locale = get_locale(locale)
         if inputs is None:
             inputs = {}
         registry = (
@@ -110,10 +136,62 @@ class Message:
             if not formatters and not selectors
             else default_registry.extend(formatters=formatters, selectors=selectors)
         )
-        return _format_message(self._ast, locale, inputs, registry)
+        compiled = self._compile(registry, locale if self._fold_constants else None)
+        analysis = self.analysis
+        if errors is None and not analysis.has_unsupported:
+            # Fail fast instead of deep inside the runtime. Unsupported syntax and
+            # unknown functions are reported before missing variables, so leave
+            # those messages to the runtime.
+            for name in analysis.required_inputs:
+                if name not in inputs and all(
+                    fn in registry.formatters or fn in registry.selectors for fn in analysis.functions
+                ):
+                    msg = f"Unresolved variable: {name}"
+                    raise UnresolvedVariable(msg)
+        return _format_message(compiled, locale, inputs, registry, errors)
+
+    def _compile(self, registry: Registry, locale: Locale | None = None) -> _Message:
+        compiled = self._compiled
+        if compiled is None or (compiled[0] is not registry and compiled[0] != registry):
+            # A different registry invalidates the compiled message and its locale specializations
+            compiled = self._compiled = (registry, compile_message(self._ast, registry), {})
+        _, message, by_locale = compiled
+        if locale is None:
+            return message
+        folded = by_locale.get(locale)
+        if folded is None:
+            folded = by_locale[locale] = fold_constants(message, registry, locale)
+        return folded
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Compiled messages refer to registry functions which need not be picklable
+        return {"msg": self.msg, "_ast": self._ast}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.msg = state["msg"]
+        self._ast = state["_ast"]
+        self._compiled = None
+        self._analysis = None
+
+    @property
+    def analysis(self) -> MessageAnalysis:
+        """Return the inputs, local variables and functions used by the message.
+
+        The analysis is computed on first access and cached.
+
+        Examples:
+            >>> message = Message(".local $greeting = {$name :string} {{Hello, {$greeting}!}}")
+            >>> message.analysis.required_inputs
+            ('name',)
+            >>> message.analysis.locals
+            frozenset({'greeting'})
+        """
+        if self._analysis is None:
+            self._analysis = analyze(self._ast)
+        return self._analysis
 
     @property
-    def datamodel(self) -> Node:
+    def datamodel(self) -> _Message:
         """Return the data model representation of the message.
 
         Examples:
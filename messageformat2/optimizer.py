@@ -0,0 +1,135 @@
+from collections.abc import Sequence
+
+from messageformat2.analysis import references
+from messageformat2.datamodel import (
+    DataModelTransformer,
+    Declaration,
+    Expression,
+    Literal,
+    LiteralExpression,
+    LocalDeclaration,
+    Markup,
+    Node,
+    Pattern,
+    PatternMessage,
+    SelectMessage,
+    UnsupportedStatement,
+    VariableExpression,
+    VariableRef,
+    Variant,
+    merge_text,
+)
+
+
+class MessageOptimizer(DataModelTransformer):
+    """Simplify a validated message without changing its formatted output.
+
+    The optimizer:
+
+    - inlines trivial local variables, i.e. `.local $a = {$b}` and `.local $a = {|literal|}`,
+    - replaces literal placeholders without a function, such as `{|text|}`, with text,
+    - merges adjacent text parts,
+    - removes declarations which are not used by the pattern, selectors or variants.
+
+    The message is transformed in place. In non-strict mode, the fallback
+    representation of a failing expression may name the inlined variable
+    instead of the local one.
+
+    Examples:
+        >>> from messageformat2.parser import parse
+        >>> message = parse(".local $unused = {$x :number} .local $user = {$name} {{Hello, {$user}{|!|}}}")
+        >>> str(MessageOptimizer().visit(message))
+        'Hello, {$name}!'
+    """
+
+    def __init__(self) -> None:
+        self.substitutions: dict[str, VariableRef | Literal] = {}
+
+    def visit_PatternMessage(self, node: PatternMessage) -> PatternMessage:
+        self.substitutions = trivial_locals(node.declarations)
+        node = self.generic_visit(node)
+        node.pattern = fold_pattern(node.pattern)
+        node.declarations = used_declarations(node.declarations, node.pattern)
+        return node
+
+    def visit_SelectMessage(self, node: SelectMessage) -> SelectMessage:
+        self.substitutions = trivial_locals(node.declarations)
+        node = self.generic_visit(node)
+        roots = [*node.selectors, *(part for variant in node.variants for part in variant.value)]
+        node.declarations = used_declarations(node.declarations, roots)
+        return node
+
+    def visit_Variant(self, node: Variant) -> Variant:
+        node = self.generic_visit(node)
+        node.value = fold_pattern(node.value)
+        return node
+
+    def visit_VariableExpression(self, node: VariableExpression) -> VariableExpression | LiteralExpression:
+        node = self.generic_visit(node)
+        if isinstance(node.arg, Literal):
+            return LiteralExpression(arg=node.arg, annotation=node.annotation, attributes=node.attributes)
+        return node
+
+    def visit_VariableRef(self, node: VariableRef) -> VariableRef | Literal:
+        match self.substitutions.get(node.name):
+            case VariableRef(name=name):
+                return VariableRef(name=name)
+            case Literal(value=value):
+                return Literal(value=value)
+            case _:
+                return node
+
+
+def trivial_locals(declarations: list[Declaration]) -> dict[str, VariableRef | Literal]:
+    """Map local variables which are plain aliases of another variable or literal to their value.
+
+    Chains of aliases are followed to the end.
+    """
+    aliases = {}
+    for decl in declarations:
+        match decl:
+            case LocalDeclaration(name=name, value=VariableExpression(arg=arg, annotation=None)):
+                aliases[name] = arg
+            case LocalDeclaration(name=name, value=LiteralExpression(arg=arg, annotation=None)):
+                aliases[name] = arg
+
+    resolved = {}
+    for name, alias in aliases.items():
+        value, seen = alias, {name}
+        while isinstance(value, VariableRef) and value.name in aliases and value.name not in seen:
+            seen.add(value.name)
+            value = aliases[value.name]
+        if not (isinstance(value, VariableRef) and value.name in seen):
+            resolved[name] = value
+    return resolved
+
+
+def fold_pattern(pattern: Pattern) -> Pattern:
+    """Replace literal placeholders without a function with text and merge adjacent text."""
+    return merge_text(literal_text(part) for part in pattern)
+
+
+def literal_text(part: str | Expression | Markup) -> str | Expression | Markup:
+    match part:
+        case LiteralExpression(arg=Literal(value=value), annotation=None):
+            return value
+        case _:
+            return part
+
+
+def used_declarations(declarations: list[Declaration], roots: Sequence[Node | str]) -> list[Declaration]:
+    """Return the declarations used by the roots, directly or through other declarations.
+
+    Unsupported statements are always kept as formatting reports them.
+    """
+    by_name = {decl.name: decl for decl in declarations if not isinstance(decl, UnsupportedStatement)}
+    statements = [decl for decl in declarations if isinstance(decl, UnsupportedStatement)]
+    pending = references([*roots, *statements])
+    used = set()
+    while pending:
+        name = pending.pop()
+        if name in used or name not in by_name:
+            continue
+        used.add(name)
+        pending.extend(references([by_name[name].value]))
+    return [decl for decl in declarations if isinstance(decl, UnsupportedStatement) or decl.name in used]
@@ -1,4 +1,7 @@
+import cProfile
 import re
+from dataclasses import dataclass
+from typing import Self
 
 from messageformat2.datamodel import (
     Attribute,
@@ -26,11 +29,13 @@ from messageformat2.datamodel import (
     Variant,
     _Matcher,
 )
-from messageformat2.errors import ParseError
+from messageformat2.errors import MessageTooLarge, ParseError
+from messageformat2.optimizer import MessageOptimizer
 
 
+# All patterns are matched at the current position of the queue with
+# `Pattern.match(text, pos)`, so they must not be anchored with `^`.
 _name_start = (
-    "^"
     "[a-zA-Z_"
     "\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u02ff"
     "\u0370-\u037d\u037f-\u1fff\u200c-\u200d"
@@ -38,17 +43,20 @@ _name_start = (
     "\uf900-\ufdcf\ufdf0-\ufffd\U00010000-\U000effff]"
 )
 name_start = re.compile(_name_start)
-name_char = re.compile(rf"{_name_start}|[0-9-.\u00B7\u0300-\u036F\u203F-\u2040]")
+_name_char = rf"{_name_start}|[0-9-.\u00B7\u0300-\u036F\u203F-\u2040]"
+name_char = re.compile(_name_char)
+name_chars = re.compile(rf"(?:{_name_char})*")
 
-number_literal = re.compile(r"^-?(?:(?:0|[1-9])\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+number_literal = re.compile(r"-?(?:(?:0|[1-9])\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
 
 _whitespace = r"[\s\u3000]"
-whitespace = re.compile(f"^{_whitespace}")
+whitespace = re.compile(_whitespace)
+optional_whitespace = re.compile(f"{_whitespace}*")
 
-text_escape = re.compile(r"^\\[\\{}]")
-quoted_escape = re.compile(r"^\\[\\|]")
-_reserved_escape = r"^\\[\\{|}]"
-reserved_escape = re.compile(f"^{_reserved_escape}")
+text_escape = re.compile(r"\\[\\{}]")
+quoted_escape = re.compile(r"\\[\\|]")
+_reserved_escape = r"\\[\\{|}]"
+reserved_escape = re.compile(_reserved_escape)
 
 _content_char = (
     "[\u0001-\u0008]|[\u000b-\u000c]|[\u000e-\u001f]|"
@@ -56,35 +64,47 @@ _content_char = (
     "[\u002f-\u003f]|[\u0041-\u005b]|"
     "[\u005d-\u007a]|[\u007e-\u2fff]|[\u3001-\ud7ff]|[\ue000-\U0010ffff]"
 )
-content_char = re.compile(f"^{_content_char}")
-
-simple_start_char = re.compile(rf"^{_content_char}|{_whitespace}|[@|]")
-text_char = re.compile(rf"^{_content_char}|{_whitespace}|[.@|]")
-quoted_char = re.compile(rf"^{_content_char}|{_whitespace}|[.@{{}}]")
+content_char = re.compile(_content_char)
+
+simple_start_char = re.compile(rf"{_content_char}|{_whitespace}|[@|]")
+_text_char = rf"{_content_char}|{_whitespace}|[.@|]"
+text_char = re.compile(_text_char)
+text_chars = re.compile(rf"(?:{_text_char})+")
+_quoted_char = rf"{_content_char}|{_whitespace}|[.@{{}}]"
+quoted_char = re.compile(_quoted_char)
+quoted_chars = re.compile(rf"(?:{_quoted_char})+")
 _reserved_char = rf"{_content_char}|[.]"
-reserved_char = re.compile(rf"^{_reserved_char}")
+reserved_char = re.compile(_reserved_char)
+reserved_chars = re.compile(rf"(?:{_reserved_char})+")
 
 markup_start = re.compile(rf"{{{_whitespace}?[#/]")
-annotation_start = re.compile(r"^[:^&!%*+<>?~]")
-input_start = re.compile(r"^\.input")
-local_start = re.compile(r"^\.local")
-match_start = re.compile(r"^\.match")
-quoted_pattern_start = re.compile(r"^\{\{")
-quoted_pattern_end = re.compile(r"^\}\}")
-reserved_body_part_start = re.compile(rf"^{_reserved_char}|{_reserved_escape}|\|")
+annotation_start = re.compile(r"[:^&!%*+<>?~]")
+input_start = re.compile(r"\.input")
+local_start = re.compile(r"\.local")
+match_start = re.compile(r"\.match")
+quoted_pattern_start = re.compile(r"\{\{")
+quoted_pattern_end = re.compile(r"\}\}")
+reserved_body_part_start = re.compile(rf"{_reserved_char}|{_reserved_escape}|\|")
 
 
 class Queue:
+    """A cursor over the message text.
+
+    The text is never copied, all operations advance an index into it so that
+    parsing is linear in the length of the message.
+    """
+
     def __init__(self, text: str) -> None:
-        self.queue = text
+        self.text = text
+        self.pos = 0
 
     def pop(self, char: str | None = None) -> str:
-        if not self.queue:
+        if self.pos >= len(self.text):
             msg = "Unexpect end of input"
             raise ParseError(msg)
 
-        s, rest = self.queue[0], self.queue[1:]
-        self.queue = rest
+        s = self.text[self.pos]
+        self.pos += 1
 
         if char is not None and s != char:
             msg = f"Expected: {char}, got: {s}"
@@ -93,51 +113,160 @@ class Queue:
         return s
 
     def peek(self) -> str | None:
-        if self.queue:
-            return self.queue[0]
+        if self.pos < len(self.text):
+            return self.text[self.pos]
         return None
 
     def peek_after_whitespace(self) -> str | None:
-        if self.queue:
-            i = 0
-            while i < len(self.queue) and whitespace.match(self.queue[i]):
-                i += 1
-            return self.queue[i]
+        i = self._skip_whitespace()
+        if i < len(self.text):
+            return self.text[i]
         return None
 
     def matches(self, pattern: re.Pattern) -> bool:
-        if self.queue:
-            return bool(pattern.match(self.queue))
-        return False
+        return bool(pattern.match(self.text, self.pos))
 
     def matches_after_whitespace(self, pattern: re.Pattern) -> bool:
-        if self.queue:
-            i = 0
-            while i < len(self.queue) and whitespace.match(self.queue[i]):
-                i += 1
-            return bool(pattern.match(self.queue[i:]))
-        return False
+        return bool(pattern.match(self.text, self._skip_whitespace()))
 
     def pop_match(self, pattern: re.Pattern) -> str:
-        if self.queue:
-            match = pattern.match(self.queue)
+        if self.pos < len(self.text):
+            match = pattern.match(self.text, self.pos)
             if not match:
-                msg = f"Did not match: {self.queue[0]}"
+                msg = f"Did not match: {self.text[self.pos]}"
                 raise ParseError(msg)
-            s, rest = match.group(), self.queue[match.end() :]
-            self.queue = rest
-            return s
+            self.pos = match.end()
+            return match.group()
         msg = "Unexpected end of input"
         raise ParseError(msg)
 
+    def pop_while(self, pattern: re.Pattern) -> str:
+        """Pop the (possibly empty) text matched by the pattern."""
+        match = pattern.match(self.text, self.pos)
+        if not match:
+            return ""
+        self.pos = match.end()
+        return match.group()
+
+    def _skip_whitespace(self) -> int:
+        match = optional_whitespace.match(self.text, self.pos)
+        return match.end() if match else self.pos
+
+    @property
+    def position(self) -> int:
+        return self.pos
+
     def __len__(self) -> int:
-        return len(self.queue)
+        return len(self.text) - self.pos
 
     def __bool__(self) -> bool:
-        return bool(self.queue)
+        return self.pos < len(self.text)
+
+
+@dataclass(frozen=True)
+class RuleTiming:
+    """Time spent in a single parser rule. Durations are in seconds."""
+
+    calls: int
+    self_time: float
+    """Time spent in the rule itself, excluding the rules it calls."""
+    total_time: float
+    """Time spent in the rule including the rules it calls."""
+
+
+class ParseProfile:
+    """Per-rule timings collected by `parse` across any number of messages.
+
+    Only one profiler can be active at a time. Messages parsed while another
+    profiler (e.g. `cProfile` or a debugger) is running are not profiled.
+
+    Examples:
+        >>> profile = ParseProfile()
+        >>> for message in ["Hello, {$name}!", "{42 :number}"]:
+        ...     _ = parse(message, profile=profile)
+        >>> profile.rules()["parse_expression"].calls
+        2
+    """
+
+    def __init__(self) -> None:
+        self._profiler = cProfile.Profile()
+        self._enabled = False
+
+    def rules(self) -> dict[str, RuleTiming]:
+        """Return the timings of each rule (function) of the parser, including `Queue` methods."""
+        rules = {}
+        for entry in self._profiler.getstats():
+            if isinstance(entry.code, str) or entry.code.co_filename != __file__:
+                continue
+            name = entry.code.co_name
+            # Methods of different classes may share a name
+            if previous := rules.get(name):
+                rules[name] = RuleTiming(
+                    calls=previous.calls + entry.callcount,
+                    self_time=previous.self_time + entry.inlinetime,
+                    total_time=previous.total_time + entry.totaltime,
+                )
+            else:
+                rules[name] = RuleTiming(calls=entry.callcount, self_time=entry.inlinetime, total_time=entry.totaltime)
+        return rules
+
+    def report(self, limit: int | None = None) -> str:
+        """Return a table of rules sorted by self time, slowest first."""
+        rules = sorted(self.rules().items(), key=lambda item: item[1].self_time, reverse=True)
+        lines = [f"{'rule':<32} {'calls':>10} {'self (ms)':>12} {'total (ms)':>12}"]
+        lines.extend(
+            f"{name:<32} {timing.calls:>10} {timing.self_time * 1e3:>12.3f} {timing.total_time * 1e3:>12.3f}"
+            for name, timing in rules[:limit]
+        )
+        return "\n".join(lines)
+
+    def __enter__(self) -> Self:
+        try:
+            self._profiler.enable()
+        except ValueError:
+            # Another profiling tool is already active
+            self._enabled = False
+        else:
+            self._enabled = True
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._enabled:
+            self._profiler.disable()
+            self._enabled = False
+
+
+def parse(
+    msg: str, *, max_length: int | None = None, profile: ParseProfile | None = None, optimize: bool = False
+) -> Message:
+    """Parse and validate a message.
+
+    Args:
+        msg: The message.
+        max_length: Maximum length of the message in characters.
+        profile: Collect per-rule timings into this profile. Profiling slows
+            down parsing considerably and should only be used for analysis.
+        optimize: Simplify the message with `MessageOptimizer` after validating it.
+
+    Raises:
+        ParseError: If the message contains a syntax error.
+        MessageTooLarge: If the message is longer than `max_length`.
+        DataModelError: If the message contains a semantic error.
+    """
+    if max_length is not None and len(msg) > max_length:
+        reason = f"Message is too long: {len(msg)} characters (maximum: {max_length})"
+        error = MessageTooLarge(reason)
+        error.position = max_length
+        raise error
+    if profile is not None:
+        with profile:
+            ast = _parse_and_validate(msg)
+    else:
+        ast = _parse_and_validate(msg)
+    return MessageOptimizer().visit(ast) if optimize else ast
 
 
-def parse(msg: str) -> Message:
+def _parse_and_validate(msg: str) -> Message:
     ast = parse_message(msg)
     DataModelValidator().visit(ast)
     return ast
@@ -145,6 +274,14 @@ def parse(msg: str) -> Message:
 
 def parse_message(msg: str) -> Message:
     queue = Queue(msg)
+    try:
+        return _parse_message(queue)
+    except ParseError as e:
+        e.position = queue.position
+        raise
+
+
+def _parse_message(queue: Queue) -> Message:
     message = parse_complex_message(queue) if queue.peek() == "." else parse_simple_message(queue)
     if queue:
         msg = f"Expected end of message but instead got: {queue.peek()}"
@@ -280,21 +417,20 @@ def parse_simple_start(queue: Queue) -> Pattern:
 
 def parse_pattern(queue: Queue) -> Pattern:
     pattern = []
-    string = ""
+    parts = []
     while queue and not queue.matches(quoted_pattern_end):
         if queue.matches(text_char):
-            string += queue.pop()
+            parts.append(queue.pop_match(text_chars))
         elif queue.matches(text_escape):
             escape = queue.pop_match(text_escape)
-            string += escape.replace(r"\{", "{").replace(r"\}", "}").replace(r"\\", "\\")
+            parts.append(escape.replace(r"\{", "{").replace(r"\}", "}").replace(r"\\", "\\"))
         else:
-            if string:
-                pattern.append(string)
-                string = ""
+            if parts:
+                pattern.append("".join(parts))
+                parts = []
             pattern.append(parse_placeholder(queue))
-    if string:
-        pattern.append(string)
-        string = ""
+    if parts:
+        pattern.append("".join(parts))
     return pattern
 
 
@@ -404,11 +540,7 @@ def parse_name(queue: Queue) -> str:
     if not queue.matches(name_start):
         msg = f"Invalid name start: {queue.peek()}"
         raise ParseError(msg)
-    name = queue.pop()
-
-    while queue.matches(name_char):
-        name += queue.pop()
-    return name
+    return queue.pop() + queue.pop_while(name_chars)
 
 
 def parse_annotation(queue: Queue) -> FunctionAnnotation | UnsupportedAnnotation:
@@ -464,17 +596,17 @@ def parse_reserved_body(queue: Queue) -> str:
 
 
 def parse_reserved_body_part(queue: Queue) -> str:
-    part = ""
+    parts = []
     while True:
         if queue.matches(reserved_char):
-            part += queue.pop()
+            parts.append(queue.pop_match(reserved_chars))
         elif queue.matches(reserved_escape):
-            part += queue.pop_match(reserved_escape)
+            parts.append(queue.pop_match(reserved_escape))
         elif queue.peek() == "|":
-            part += str(parse_quoted_literal(queue))
+            parts.append(str(parse_quoted_literal(queue)))
         else:
             break
-    return part
+    return "".join(parts)
 
 
 def parse_attribute(queue: Queue) -> Attribute:
@@ -519,22 +651,22 @@ def parse_literal(queue: Queue) -> Literal:
 
 
 def parse_quoted_literal(queue: Queue) -> Literal:
-    literal = ""
+    parts = []
     queue.pop("|")
     while True:
         if queue.matches(quoted_escape):
             escape = queue.pop_match(quoted_escape)
             if escape == r"\\":
-                literal += "\\"
+                parts.append("\\")
             else:
-                literal += "|"
+                parts.append("|")
         elif queue.matches(quoted_char):
-            literal += queue.pop()
+            parts.append(queue.pop_match(quoted_chars))
         else:
             break
 
     queue.pop("|")
-    return Literal(value=literal)
+    return Literal(value="".join(parts))
 
 
 def parse_unquoted_literal(queue: Queue) -> Literal:
@@ -551,7 +683,4 @@ def parse_whitespace(queue: Queue) -> str:
 
 
 def parse_optional_whitespace(queue: Queue) -> str:
-    ws = ""
-    while queue.matches(whitespace):
-        ws += queue.pop()
-    return ws
+    return queue.pop_while(optional_whitespace)
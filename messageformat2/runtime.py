@@ -1,11 +1,17 @@
-from dataclasses import dataclass
+import copy
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, replace
+from types import MappingProxyType
 from typing import Any
 
 from babel import Locale
 
 from messageformat2.builtins import Registry
+from messageformat2.datamodel import DataModelTransformer, merge_text
 from messageformat2.errors import (
+    FormatError,
     InvalidExpression,
+    OperandMismatch,
     SelectionError,
     UnknownFunction,
     UnresolvedVariable,
@@ -38,54 +44,318 @@ from messageformat2.parser import UnsupportedStatement as _UnsupportedStatement
 
 
 @dataclass
+class CoercedLiteral(Literal):
+    """Literal option value already validated and converted by the function's option schema."""
+
+    coerced: Any = None
+
+
+_no_options: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass
+class CompiledAnnotation(FunctionAnnotation):
+    """Function annotation with its literal options resolved ahead of time."""
+
+    static: Mapping[str, Any]
+    """Coerced values of literal options. This mapping is shared between calls and must not be modified."""
+    dynamic: tuple[Option, ...]
+    """Options bound to variables which are resolved on every call."""
+
+
+@dataclass
+class InvalidAnnotation(FunctionAnnotation):
+    """Function annotation with an invalid literal option, reported whenever the expression is resolved."""
+
+    error: InvalidExpression
+    """The error raised by the option schema. It is copied each time it is reported."""
+
+
+class MessageCompiler(DataModelTransformer):
+    """Prepare a message for formatting with a given registry.
+
+    Literal options of functions are validated and converted using the
+    registry's option schemas so that this does not need to happen on every
+    call. Only options bound to variables are converted at format time.
+    Functions with an invalid literal option are replaced with an
+    `InvalidAnnotation`, so that the error is only reported if the expression
+    is evaluated, and the error is appended to `errors`.
+    Markup without variable options is rendered to text, and the text of each
+    pattern is merged into a `CompiledPattern`.
+    """
+
+    def __init__(self, registry: Registry) -> None:
+        self.registry = registry
+        self.errors: list[InvalidExpression] = []
+        """Errors of the invalid literal options found so far."""
+
+    def visit_FunctionAnnotation(self, node: FunctionAnnotation) -> "CompiledAnnotation | InvalidAnnotation":
+        literals = {opt.name: opt.value.value for opt in node.options if isinstance(opt.value, Literal)}
+        try:
+            coerced = self.registry.coerce_options(node.name, literals)
+        except InvalidExpression as e:
+            self.errors.append(e)
+            return InvalidAnnotation(name=node.name, options=node.options, error=e)
+        options = []
+        dynamic = []
+        for opt in node.options:
+            match opt.value:
+                case VariableRef():
+                    options.append(opt)
+                    dynamic.append(opt)
+                case Literal(value=value) if opt.name in coerced:
+                    options.append(Option(name=opt.name, value=CoercedLiteral(value=value, coerced=coerced[opt.name])))
+        static = MappingProxyType(coerced) if coerced else _no_options
+        return CompiledAnnotation(name=node.name, options=options, static=static, dynamic=tuple(dynamic))
+
+    def visit_Markup(self, node: Markup) -> Markup | str:
+        # Markup with literal options always renders the same, turn it into text
+        literals = [(opt.name, opt.value.value) for opt in node.options if isinstance(opt.value, Literal)]
+        if len(literals) == len(node.options):
+            return render_markup(node, literals)
+        return node
+
+    def visit_PatternMessage(self, node: PatternMessage) -> PatternMessage:
+        node = self.generic_visit(node)
+        node.pattern = CompiledPattern(node.pattern)
+        return node
+
+    def visit_Variant(self, node: Variant) -> Variant:
+        node = self.generic_visit(node)
+        node.value = CompiledPattern(node.value)
+        return node
+
+
+type CompiledPlaceholder = Expression | Markup
+
+
+class CompiledPattern(list[str | CompiledPlaceholder]):
+    """A pattern with adjacent text parts merged and the positions of its placeholders precomputed.
+
+    Formatting copies the text parts and only replaces the placeholders, so
+    static text is never inspected or concatenated again.
+    """
+
+    def __init__(self, parts: Pattern) -> None:
+        merged = merge_text(parts)
+        super().__init__(merged)
+        self.placeholders = tuple((i, part) for i, part in enumerate(merged) if not isinstance(part, str))
+        """The placeholders and their positions."""
+        self.slots = tuple(i for i, _ in self.placeholders)
+        """Positions of the placeholders."""
+        self.template = [part if isinstance(part, str) else "" for part in merged]
+        """The text parts, with an empty string in place of each placeholder."""
+        self.text = "".join(self.template) if not self.slots else None
+        """The whole text if the pattern has no placeholders."""
+
+
+def compile_message(message: Message, registry: Registry) -> Message:
+    """Return a copy of the message prepared for formatting with the registry.
+
+    Invalid literal options do not raise here, they are reported when the
+    expression is formatted. Use `check_options` to find them up front.
+    """
+    return MessageCompiler(registry).visit(copy.deepcopy(message))
+
+
+def check_options(message: Message, registry: Registry) -> None:
+    """Check the literal options of all functions in the message, including those which are never evaluated.
+
+    Raises:
+        InvalidExpression: If a function is given an invalid literal option.
+    """
+    compiler = MessageCompiler(registry)
+    compiler.visit(copy.deepcopy(message))
+    if compiler.errors:
+        raise compiler.errors[0]
+
+
+class ConstantFolder(DataModelTransformer):
+    """Specialize a compiled message for a locale.
+
+    Placeholders with a literal operand, literal options and a pure formatter
+    (see `Registry.pure`) always format to the same text in a given locale, so
+    they are formatted once and replaced with that text. Expressions which fail
+    to format are kept so that the error is reported when the message is
+    formatted.
+
+    The compiled message is not modified, patterns containing folded
+    placeholders are copied.
+    """
+
+    def __init__(self, registry: Registry, locale: Locale) -> None:
+        self.ctx = FormattingContext(locale=locale, inputs={}, registry=registry, declarations={})
+        self.folded = False
+
+    def visit_PatternMessage(self, node: PatternMessage) -> PatternMessage:
+        return replace(node, pattern=self.fold(node.pattern))
+
+    def visit_SelectMessage(self, node: SelectMessage) -> SelectMessage:
+        return replace(node, variants=[self.visit(variant) for variant in node.variants])
+
+    def visit_Variant(self, node: Variant) -> Variant:
+        return replace(node, value=self.fold(node.value))
+
+    def fold(self, pattern: Pattern) -> Pattern:
+        if not isinstance(pattern, CompiledPattern):
+            return pattern
+        parts = list(pattern)
+        changed = False
+        for i in pattern.slots:
+            match parts[i]:
+                case LiteralExpression(annotation=CompiledAnnotation(name=name, dynamic=())) as expression if (
+                    name in self.ctx.registry.pure
+                ):
+                    try:
+                        parts[i] = format_expression(expression, self.ctx)
+                    except FormatError:
+                        continue
+                    changed = True
+        if not changed:
+            return pattern
+        self.folded = True
+        return CompiledPattern(parts)
+
+
+def fold_constants(message: Message, registry: Registry, locale: Locale) -> Message:
+    """Return the compiled message with its constant placeholders formatted for the locale.
+
+    The message itself is returned if there is nothing to fold.
+    """
+    folder = ConstantFolder(registry, locale)
+    folded = folder.visit(message)
+    return folded if folder.folded else message
+
+
+@dataclass(slots=True)
 class FormattingContext:
     locale: Locale
     inputs: dict[str, Any]
     registry: Registry
     declarations: dict[str, Any]
     strict: bool = True
+    errors: list[FormatError] | None = None
+    """Errors collected in non-strict mode."""
+
+
+def report(error: FormatError, ctx: FormattingContext) -> None:
+    """Raise the error in strict mode, otherwise collect it."""
+    if ctx.strict or ctx.errors is None:
+        raise error
+    ctx.errors.append(error)
+
+
+def fallback(expression: Expression | None) -> str:
+    """Return the fallback representation of an expression which could not be formatted."""
+    match expression:
+        case VariableExpression(arg=VariableRef(name=name)):
+            return f"${name}"
+        case LiteralExpression(arg=Literal(value=value)):
+            escaped = value.replace("\\", "\\\\").replace("|", "\\|")
+            return f"|{escaped}|"
+        case FunctionExpression(annotation=FunctionAnnotation(name=name)):
+            return f":{name}"
+        case _UnsupportedExpression(annotation=UnsupportedAnnotation(source=source)):
+            return source[0]
+    return "\ufffd"
+
+
+class Fallback:
+    """Value of an expression which could not be resolved in non-strict mode.
+
+    It formats as its fallback representation, e.g. `{$name}`, and matches
+    only catch-all variant keys.
+    """
+
+    __slots__ = ("source",)
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+
+    def format(self, ctx: FormattingContext) -> str:  # noqa: ARG002
+        return f"{{{self.source}}}"
+
+    def select(self, ctx: FormattingContext, *, keys: list[str]) -> list[str]:  # noqa: ARG002
+        return []
+
+    def __repr__(self) -> str:
+        return f"Fallback({self.source})"
 
 
 class LazyValue:
-    def __init__(self, *, fn_name: str, value: Any = None, options: dict[str, Any] | None = None):
+    __slots__ = ("fn_name", "options", "source", "value")
+
+    def __init__(
+        self,
+        *,
+        fn_name: str,
+        value: Any = None,
+        options: dict[str, Any] | None = None,
+        source: Expression | None = None,
+    ):
         self.fn_name = fn_name
         self.value = value
-        self.options = options or {}
+        self.options = {} if options is None else options
+        self.source = source
+        """The expression this value was created from, used for the fallback representation."""
 
     def format(self, ctx: FormattingContext) -> str:
         if annotation := ctx.registry.formatters.get(self.fn_name):
             try:
                 return str(annotation(value=self.value, locale=ctx.locale, options=self.options))
-            except InvalidExpression:
-                raise
+            except InvalidExpression as e:
+                report(e, ctx)
             except Exception as e:
                 msg = "Exception raised while evaluating formatter"
-                raise InvalidExpression(msg) from e
-        msg = f"Unknown function: {self.fn_name}"
-        raise UnknownFunction(msg)
+                error = InvalidExpression(msg)
+                error.__cause__ = e
+                report(error, ctx)
+        else:
+            msg = f"Unknown function: {self.fn_name}"
+            report(UnknownFunction(msg), ctx)
+        return f"{{{fallback(self.source)}}}"
 
     def select(self, ctx: FormattingContext, *, keys: list[str]) -> list[str]:
         if selector := ctx.registry.selectors.get(self.fn_name):
             try:
                 return selector(value=self.value, locale=ctx.locale, options=self.options, keys=keys)
-            except SelectionError:
-                raise
+            except SelectionError as e:
+                report(e, ctx)
             except Exception as e:
                 msg = "Exception raised while evaluating selector"
-                raise SelectionError(msg) from e
-        msg = f"Unknown selector: {self.fn_name}"
-        raise UnknownFunction(msg)
+                error = SelectionError(msg)
+                error.__cause__ = e
+                report(error, ctx)
+        else:
+            msg = f"Unknown selector: {self.fn_name}"
+            report(UnknownFunction(msg), ctx)
+        return []
 
     def __repr__(self):
         return f"LazyValue({self.fn_name}({self.value}, {self.options}))"
 
 
-def format_message(message: Message, locale: Locale, inputs: dict[str, Any], registry: Registry) -> str:
+def format_message(
+    message: Message,
+    locale: Locale,
+    inputs: dict[str, Any],
+    registry: Registry,
+    errors: list[FormatError] | None = None,
+) -> str:
+    """Format a message.
+
+    If `errors` is None, the first error is raised. Otherwise formatting is
+    non-strict: errors are appended to the list and the parts of the message
+    which could not be formatted are replaced with their fallback
+    representation, e.g. `{$name}` for a missing variable.
+    """
     ctx = FormattingContext(
         locale=locale,
         inputs=inputs,
         registry=registry,
         declarations={},
+        strict=errors is None,
+        errors=errors,
     )
     match message:
         case PatternMessage():
@@ -99,35 +369,58 @@ def format_pattern_message(message: PatternMessage, ctx: FormattingContext) -> s
         match decl:
             case _UnsupportedStatement():
                 msg = "Unsupported statement"
-                raise UnsupportedStatement(msg)
+                report(UnsupportedStatement(msg), ctx)
             case _:
                 ctx.declarations[decl.name] = decl
     return format_pattern(message.pattern, ctx)
 
 
 def format_pattern(pattern: Pattern, ctx: FormattingContext) -> str:
-    output = ""
-    for part in pattern:
-        match part:
-            case str():
-                output += part
-            case LiteralExpression() | VariableExpression() | FunctionExpression() | _UnsupportedExpression():
-                output += format_expression(part, ctx)
+    if isinstance(pattern, CompiledPattern):
+        if pattern.text is not None:
+            return pattern.text
+        output = list(pattern.template)
+        for i, placeholder in pattern.placeholders:
+            output[i] = format_placeholder(placeholder, ctx)
+        return "".join(output)
+    return "".join(part if isinstance(part, str) else format_placeholder(part, ctx) for part in pattern)
+
+
+def format_placeholder(placeholder: Expression | Markup, ctx: FormattingContext) -> str:
+    try:
+        match placeholder:
             case Markup():
-                output += format_markup(part, ctx)
-    return output
+                return format_markup(placeholder, ctx)
+            case _:
+                return format_expression(placeholder, ctx)
+    except FormatError as e:
+        # Common errors are collected without raising, this catches the rest
+        report(e, ctx)
+        return "" if isinstance(placeholder, Markup) else f"{{{fallback(placeholder)}}}"
 
 
 def format_select_message(message: SelectMessage, ctx: FormattingContext) -> str:
+    return format_pattern(select_pattern(message, ctx), ctx)
+
+
+def select_pattern(message: SelectMessage, ctx: FormattingContext) -> Pattern:
+    """Resolve the selectors and return the pattern of the best matching variant."""
     for decl in message.declarations:
         match decl:
             case _UnsupportedStatement():
                 msg = "Unsupported statement"
-                raise UnsupportedStatement(msg)
+                report(UnsupportedStatement(msg), ctx)
             case _:
                 ctx.declarations[decl.name] = decl
 
-    selectors = [resolve_selector(selector, ctx) for selector in message.selectors]
+    selectors = []
+    for selector in message.selectors:
+        try:
+            selectors.append(resolve_selector(selector, ctx))
+        except FormatError as e:
+            # A selector which cannot be resolved only matches the catch-all variant
+            report(e, ctx)
+            selectors.append(Fallback(fallback(selector)))
 
     pref = []
     for i, selector in enumerate(selectors):
@@ -135,8 +428,7 @@ def format_select_message(message: SelectMessage, ctx: FormattingContext) -> str
         pref.append(selector.select(ctx, keys=keys))
 
     variants = filter_variants(pref, message.variants)
-    pattern = sort_variants(pref, variants)
-    return format_pattern(pattern, ctx)
+    return sort_variants(pref, variants)
 
 
 def filter_variants(pref: list, variants: list[Variant]) -> list[Variant]:
@@ -183,34 +475,66 @@ def resolve_selector(selector: Expression, ctx: FormattingContext) -> Any | Lazy
 def format_expression(expression: Expression, ctx: FormattingContext) -> str:
     resolved = resolve_expression(expression, ctx)
     match resolved:
-        case LazyValue() as lazy_value:
-            return lazy_value.format(ctx)
+        case LazyValue() | Fallback():
+            return resolved.format(ctx)
         case _:
             return str(resolved)
 
 
 def format_markup(markup: Markup, ctx: FormattingContext) -> str:
-    options = format_options(markup.options, ctx)
-    options = f" {options}" if options else ""
-
-    if markup.kind == "standalone":
-        return f"<{markup.name}{options}/>"
-    if markup.kind == "open":
-        return f"<{markup.name}{options}>"
-    return f"</{markup.name}{options}>"
+    return render_markup(markup, format_options(markup.options, ctx))
 
 
-def format_options(options: list[Option], ctx: FormattingContext) -> str:
-    return " ".join(format_option(opt, ctx) for opt in options)
+def render_markup(markup: Markup, options: Iterable[tuple[str, Any]]) -> str:
+    """Render markup as an HTML-like tag with the given option names and values."""
+    rendered = "".join(f" {name}={value}" for name, value in options)
 
-
-def format_option(option: Option, ctx: FormattingContext) -> str:
-    value = resolve_option(option, ctx)
-    return f"{option.name}={value}"
+    if markup.kind == "standalone":
+        return f"<{markup.name}{rendered}/>"
+    if markup.kind == "open":
+        return f"<{markup.name}{rendered}>"
+    return f"</{markup.name}{rendered}>"
+
+
+def format_options(options: list[Option], ctx: FormattingContext) -> list[tuple[str, Any]]:
+    """Resolve the options of markup, dropping those which could not be resolved."""
+    resolved = [(opt.name, resolve_option(opt, ctx)) for opt in options]
+    return [(name, value) for name, value in resolved if not isinstance(value, Fallback)]
+
+
+def resolve_options(annotation: FunctionAnnotation, ctx: FormattingContext) -> dict[str, Any]:
+    """Return the options of a function call, a new dictionary on every call."""
+    if isinstance(annotation, CompiledAnnotation):
+        if not annotation.dynamic:
+            # Functions may modify their options, never hand out the shared mapping
+            return dict(annotation.static)
+        unchecked = {opt.name: resolve_option(opt, ctx) for opt in annotation.dynamic}
+        if not ctx.strict:
+            unchecked = {name: value for name, value in unchecked.items() if not isinstance(value, Fallback)}
+        return {**annotation.static, **ctx.registry.coerce_options(annotation.name, unchecked)}
+
+    options = {}
+    unchecked = {}
+    for opt in annotation.options:
+        match opt.value:
+            case CoercedLiteral(coerced=coerced):
+                options[opt.name] = coerced
+            case _:
+                value = resolve_option(opt, ctx)
+                if not isinstance(value, Fallback):
+                    unchecked[opt.name] = value
+    if unchecked:
+        options |= ctx.registry.coerce_options(annotation.name, unchecked)
+    return options
 
 
-def resolve_options(options: list[Option], ctx: FormattingContext) -> dict[str, Any]:
-    return {opt.name: resolve_option(opt, ctx) for opt in options}
+def merge_options(base: dict[str, Any], options: dict[str, Any]) -> dict[str, Any]:
+    """Return the base options overridden by options, copying only if both are non-empty."""
+    if not options:
+        return base
+    if not base:
+        return options
+    return {**base, **options}
 
 
 def resolve_option(option: Option, ctx: FormattingContext) -> Any:
@@ -223,71 +547,102 @@ def resolve_option(option: Option, ctx: FormattingContext) -> Any:
                 case LazyValue() as lazy_value:
                     return lazy_value.format(ctx)
                 case _:
+                    # Fallback values are passed on so that the option can be dropped
                     return resolved
 
 
-def resolve_expression(expression: Expression, ctx: FormattingContext) -> Any | LazyValue:
+def resolve_expression(expression: Expression, ctx: FormattingContext) -> Any | LazyValue:  # noqa: PLR0911
     match expression:
         case LiteralExpression(arg=Literal(value), annotation=annotation):
             if not annotation:
                 return value
             match annotation:
-                case FunctionAnnotation(name=name, options=options):
-                    options = resolve_options(options, ctx)
-                    return LazyValue(fn_name=name, value=value, options=options)
+                case InvalidAnnotation(error=error):
+                    report(copy.copy(error), ctx)
+                    return Fallback(fallback(expression))
+                case FunctionAnnotation(name=name):
+                    options = resolve_options(annotation, ctx)
+                    return LazyValue(fn_name=name, value=value, options=options, source=expression)
                 case UnsupportedAnnotation():
                     msg = "Unsupported expression"
-                    raise UnsupportedExpression(msg)
+                    report(UnsupportedExpression(msg), ctx)
+                    return Fallback(fallback(expression))
         case VariableExpression(arg=VariableRef(ref), annotation=annotation):
             if not annotation:
                 return resolve_variable(ref, ctx)
             match annotation:
-                case FunctionAnnotation(name=name, options=options):
+                case InvalidAnnotation(error=error):
+                    report(copy.copy(error), ctx)
+                    return Fallback(fallback(expression))
+                case FunctionAnnotation(name=name):
                     resolved = resolve_variable(ref, ctx)
-                    options = resolve_options(options, ctx)
+                    options = resolve_options(annotation, ctx)
                     match resolved:
                         case LazyValue(fn_name=lazy_function, value=lazy_value, options=lazy_options):
                             if lazy_function and lazy_function != name:
                                 msg = f"Function mismatch: {lazy_function} != {name}"
-                                raise ValueError(msg)
-                            return LazyValue(fn_name=name, value=lazy_value, options=(lazy_options or {}) | options)
+                                report(OperandMismatch(msg), ctx)
+                                return Fallback(fallback(expression))
+                            return LazyValue(
+                                fn_name=name,
+                                value=lazy_value,
+                                options=merge_options(lazy_options, options),
+                                source=expression,
+                            )
+                        case Fallback():
+                            return resolved
                         case _:
-                            return LazyValue(fn_name=name, value=resolved, options=options)
+                            return LazyValue(fn_name=name, value=resolved, options=options, source=expression)
                 case UnsupportedAnnotation():
                     msg = "Unsupported expression"
-                    raise UnsupportedExpression(msg)
-        case FunctionExpression(annotation=FunctionAnnotation(name=name, options=options)):
-            options = resolve_options(options, ctx)
-            return LazyValue(fn_name=name, value=None, options=options)
+                    report(UnsupportedExpression(msg), ctx)
+                    return Fallback(fallback(expression))
+        case FunctionExpression(annotation=InvalidAnnotation(error=error)):
+            report(copy.copy(error), ctx)
+            return Fallback(fallback(expression))
+        case FunctionExpression(annotation=FunctionAnnotation(name=name) as annotation):
+            options = resolve_options(annotation, ctx)
+            return LazyValue(fn_name=name, value=None, options=options, source=expression)
         case _UnsupportedExpression(annotation=annotation):
             msg = f"Unsupported expression: {annotation}"
-            raise UnsupportedExpression(msg)
+            report(UnsupportedExpression(msg), ctx)
+            return Fallback(fallback(expression))
 
 
-def resolve_variable(name: str, ctx: FormattingContext) -> Any:
+def resolve_variable(name: str, ctx: FormattingContext) -> Any:  # noqa: PLR0911
     if name in ctx.declarations:
         decl = ctx.declarations[name]
         match decl:
-            case InputDeclaration(value=VariableExpression(annotation=annotation)):
+            case InputDeclaration(value=VariableExpression(annotation=annotation) as expression):
                 if not annotation:
                     return resolve_global(name, ctx)
                 match annotation:
-                    case FunctionAnnotation(name=fn_name, options=options):
+                    case InvalidAnnotation(error=error):
+                        report(copy.copy(error), ctx)
+                        return Fallback(fallback(expression))
+                    case FunctionAnnotation(name=fn_name):
                         resolved = resolve_global(name, ctx)
-                        options = resolve_options(options, ctx)
+                        options = resolve_options(annotation, ctx)
                         match resolved:
                             case LazyValue(fn_name=lazy_fn_name, value=lazy_value, options=lazy_options):
                                 if lazy_fn_name and lazy_fn_name != fn_name:
                                     msg = f"Function mismatch: {lazy_fn_name} != {fn_name}"
-                                    raise ValueError(msg)
+                                    report(OperandMismatch(msg), ctx)
+                                    return Fallback(fallback(expression))
                                 return LazyValue(
-                                    fn_name=fn_name, value=lazy_value, options=(lazy_options or {}) | options
+                                    fn_name=fn_name,
+                                    value=lazy_value,
+                                    options=merge_options(lazy_options, options),
+                                    source=expression,
                                 )
+                            case Fallback():
+                                return resolved
                             case _:
-                                return LazyValue(fn_name=fn_name, value=resolved, options=options)
-                    case UnsupportedAnnotation(annotation=annotation):
+                                return LazyValue(fn_name=fn_name, value=resolved, options=options, source=expression)
+                    case UnsupportedAnnotation():
                         msg = f"Unsupported expression: {annotation}"
-                        raise UnsupportedExpression(msg)
+                        report(UnsupportedExpression(msg), ctx)
+                        return Fallback(fallback(expression))
             case _:
                 expression = decl.value
                 return resolve_expression(expression, ctx)
@@ -298,4 +653,5 @@ def resolve_global(name: str, ctx: FormattingContext) -> Any:
     if name in ctx.inputs:
         return ctx.inputs[name]
     msg = f"Unresolved variable: {name}"
-    raise UnresolvedVariable(msg)
+    report(UnresolvedVariable(msg), ctx)
+    return Fallback(f"${name}")
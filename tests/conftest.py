@@ -0,0 +1,28 @@
+from collections.abc import Callable
+
+import pytest
+
+from messageformat2.instrumentation import Allocations, measure_allocations
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--run-slow", action="store_true", help="Run slow and timing-sensitive tests.")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "slow: slow or timing-sensitive test, only run with --run-slow")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="Use --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def allocations() -> Callable[[Callable[[], object]], Allocations]:
+    """Measure the memory allocated by a single call of a function using tracemalloc."""
+    return measure_allocations
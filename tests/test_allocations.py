@@ -0,0 +1,105 @@
+import tracemalloc
+
+import pytest
+
+from messageformat2 import Message, runtime
+from messageformat2.builtins import default_registry, get_locale
+from messageformat2.parser import parse
+from messageformat2.runtime import compile_message
+
+
+MESSAGES = {
+    "simple": ("Hello, {$name}!", {"name": "Alice"}),
+    "complex": (
+        """\
+.input {$count :number minimumFractionDigits=2}
+.local $name = {$user}
+{{{#strong}{$name}{/strong} bought {$count} items.}}""",
+        {"count": 1.5, "user": "Alice"},
+    ),
+    "select": (
+        """\
+.input {$count :integer}
+.match {$count}
+0   {{No items}}
+one {{One item}}
+*   {{{$count} items}}""",
+        {"count": 42},
+    ),
+}
+
+# Upper bounds for (retained blocks, peak bytes) of a single call. They leave
+# some headroom for differences between Python versions; update them when a
+# change deliberately allocates more.
+PARSE_THRESHOLDS = {
+    "simple": (25, 3_500),
+    "complex": (100, 9_000),
+    "select": (90, 8_000),
+}
+FORMAT_THRESHOLDS = {
+    "simple": (8, 1_200),
+    "complex": (12, 2_100),
+    "select": (10, 2_100),
+}
+
+
+@pytest.mark.parametrize("name", MESSAGES)
+def test_parse_allocations(allocations, name):
+    source, _ = MESSAGES[name]
+    result = allocations(lambda: parse(source))
+    max_blocks, max_peak = PARSE_THRESHOLDS[name]
+    assert result.blocks <= max_blocks
+    assert result.peak <= max_peak
+
+
+@pytest.mark.parametrize("name", MESSAGES)
+def test_format_allocations(allocations, name):
+    source, inputs = MESSAGES[name]
+    message = Message(source)
+    result = allocations(lambda: message.format(inputs, "en"))
+    max_blocks, max_peak = FORMAT_THRESHOLDS[name]
+    assert result.blocks <= max_blocks
+    assert result.peak <= max_peak
+
+
+def test_allocations_fixture(allocations):
+    result = allocations(lambda: [object() for _ in range(100)])
+    assert result.blocks >= 100
+    assert result.size > 0
+    assert result.peak > 0
+
+
+def test_placeholder_allocations():
+    # Count the memory blocks allocated by the runtime which are alive while
+    # the formatter of a placeholder runs: the formatting context, the lazy
+    # value, its options and the partially filled output.
+    counts = []
+
+    def probe(value, locale, options) -> object:  # noqa: ARG001
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces([runtime_only])
+            counts.append(sum(stat.count for stat in snapshot.statistics("filename")))
+        return value
+
+    runtime_only = tracemalloc.Filter(inclusive=True, filename_pattern=runtime.__file__)
+    registry = default_registry.extend(formatters={"probe": probe})
+    locale = get_locale("en")
+    # Every call gets its own options dictionary, whether the options are literal or not
+    for source, max_blocks in [("{$x :probe}", 8), ("{42 :probe opt=value}", 8), ("{$x :probe opt=$y}", 8)]:
+        message = compile_message(parse(source), registry)
+        runtime.format_message(message, locale, {"x": 1, "y": 2}, registry)
+
+        counts.clear()
+        tracemalloc.start()
+        try:
+            runtime.format_message(message, locale, {"x": 1, "y": 2}, registry)
+        finally:
+            tracemalloc.stop()
+        assert counts
+        assert counts[0] <= max_blocks, source
+
+
+def test_runtime_objects_have_no_dict():
+    assert not hasattr(runtime.LazyValue(fn_name="number"), "__dict__")
+    context = runtime.FormattingContext(locale=get_locale("en"), inputs={}, registry=default_registry, declarations={})
+    assert not hasattr(context, "__dict__")
@@ -0,0 +1,127 @@
+import pickle
+
+import pytest
+
+from messageformat2 import Message
+from messageformat2.analysis import MessageAnalysis
+from messageformat2.errors import UnknownFunction, UnresolvedVariable, UnsupportedStatement
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    [
+        ("Hello, world!", MessageAnalysis(frozenset(), (), frozenset(), frozenset(), 0, has_unsupported=False)),
+        (
+            "{$a} {$b :number} {|x| :string}",
+            MessageAnalysis(
+                frozenset({"a", "b"}),
+                ("a", "b"),
+                frozenset(),
+                frozenset({"number", "string"}),
+                0,
+                has_unsupported=False,
+            ),
+        ),
+        (
+            "{$a :number minimumFractionDigits=$digits}",
+            MessageAnalysis(
+                frozenset({"a", "digits"}),
+                ("a", "digits"),
+                frozenset(),
+                frozenset({"number"}),
+                0,
+                has_unsupported=False,
+            ),
+        ),
+        (
+            # Unused declarations do not make their variables required
+            ".input {$a :number} .local $b = {$c} .local $d = {$b} {{{$a}}}",
+            MessageAnalysis(
+                frozenset({"a", "c"}), ("a",), frozenset({"b", "d"}), frozenset({"number"}), 0, has_unsupported=False
+            ),
+        ),
+        (
+            ".local $b = {$c :number style=$style} .local $d = {$b} {{{$d}}}",
+            MessageAnalysis(
+                frozenset({"c", "style"}),
+                ("c", "style"),
+                frozenset({"b", "d"}),
+                frozenset({"number"}),
+                0,
+                has_unsupported=False,
+            ),
+        ),
+        (
+            # Attributes are never resolved
+            "{$a @attr=$b} {#tag opt=$c @attr=$d}",
+            MessageAnalysis(frozenset({"a", "c"}), ("a", "c"), frozenset(), frozenset(), 0, has_unsupported=False),
+        ),
+        (
+            # Variables used only in some variants are not required
+            ".match {$a :integer} {$b :string} 1 x {{{$c}}} * * {{{$a}}}",
+            MessageAnalysis(
+                frozenset({"a", "b", "c"}),
+                ("a", "b"),
+                frozenset(),
+                frozenset({"integer", "string"}),
+                2,
+                has_unsupported=False,
+            ),
+        ),
+        (
+            "{$a !horse}",
+            MessageAnalysis(frozenset({"a"}), ("a",), frozenset(), frozenset(), 0, has_unsupported=True),
+        ),
+    ],
+)
+def test_analysis(message, expected):
+    assert Message(message).analysis == expected
+
+
+def test_analysis_is_cached():
+    message = Message("{$a}")
+    assert message.analysis is message.analysis
+
+    message = pickle.loads(pickle.dumps(message))  # noqa: S301
+    assert message.analysis.required_inputs == ("a",)
+
+
+def test_missing_input_fails_fast():
+    calls = []
+    message = Message(".input {$count :integer} {{{42 :probe} {$count} {$name}}}")
+
+    def probe(value, locale, options) -> object:  # noqa: ARG001
+        calls.append(value)
+        return value
+
+    with pytest.raises(UnresolvedVariable, match="Unresolved variable: count"):
+        message.format({"name": "Alice"}, formatters={"probe": probe})
+    with pytest.raises(UnresolvedVariable, match="Unresolved variable: name"):
+        message.format({"count": 1}, formatters={"probe": probe})
+    # The check happens before anything is formatted
+    assert calls == []
+
+
+@pytest.mark.parametrize(
+    ("message", "error"),
+    [
+        # Errors which precede the missing variable are reported first
+        ("{:unknown} {$x}", UnknownFunction),
+        ("{$x} {:unknown}", UnresolvedVariable),
+    ],
+)
+def test_missing_input_error_order(message, error):
+    with pytest.raises(error):
+        Message(message).format()
+
+
+def test_missing_input_non_strict():
+    errors = []
+    assert Message("Hello, {$name}!").format(errors=errors) == "Hello, {$name}!"
+    assert [str(error) for error in errors] == ["Unresolved variable: name"]
+
+
+def test_missing_input_unsupported():
+    message = Message(".unknown {$x} .match {$count :integer} * {{Reserved statement}}")
+    with pytest.raises(UnsupportedStatement):
+        message.format()
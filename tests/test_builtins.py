@@ -0,0 +1,200 @@
+import datetime
+import itertools
+from decimal import Decimal
+
+import pytest
+from babel import Locale
+from babel.localedata import locale_identifiers
+from babel.numbers import UnsupportedNumberingSystemError, format_decimal, format_percent
+
+from messageformat2 import Message, warm_up
+from messageformat2.builtins import _format_integer_fast, default_registry, digits, get_locale, one_of, to_datetime
+from messageformat2.errors import InvalidExpression
+from messageformat2.runtime import check_options, compile_message
+from messageformat2.runtime import format_message as _format_message
+
+
+@pytest.mark.parametrize("locales", [["en"], ["en_US", "cs", "ar"], [Locale.parse("de")]])
+def test_warm_up(locales):
+    timings = warm_up(locales)
+    assert list(timings) == [str(locale) for locale in locales]
+    assert all(t >= 0 for t in timings.values())
+
+
+def test_warm_up_functions():
+    calls = []
+
+    def custom(value, locale, options) -> str:
+        calls.append((value, locale, options))
+        return str(value)
+
+    registry = default_registry.extend(formatters={"custom": custom})
+    warm_up(["en"], functions=["number", "custom"], registry=registry)
+    # Custom functions have no sample inputs so they are not called
+    assert calls == []
+
+
+def test_get_locale():
+    locale = Locale.parse("cs_CZ")
+    assert get_locale(locale) is locale
+    assert get_locale("cs_CZ") == locale
+    assert get_locale("cs_CZ") is get_locale("cs_CZ")
+    assert get_locale(None) is get_locale()
+
+
+@pytest.mark.parametrize(
+    ("message", "inputs", "formatted"),
+    [
+        ("{$d :date style=long}", {"d": "2024-05-10T12:30:00"}, "May 10, 2024"),
+        ("{$d :date style=long}", {"d": 1715344200}, "May 10, 2024"),
+        ("{$d :date style=long}", {"d": 1715344200.5}, "May 10, 2024"),
+        ("{$d :date style=long}", {"d": datetime.datetime(2024, 5, 10)}, "May 10, 2024"),  # noqa: DTZ001
+        ("{$d :time style=short}", {"d": "2024-05-10T12:30:00"}, "12:30\u202fPM"),
+        ("{$d :time style=short}", {"d": 1715344200}, "12:30\u202fPM"),
+        ("{$d :datetime format=short}", {"d": 1715344200}, "5/10/24, 12:30\u202fPM"),
+    ],
+)
+def test_datetime_inputs(message, inputs, formatted):
+    assert Message(message).format(inputs, "en_US") == formatted
+
+
+def test_to_datetime_cache():
+    value = "2001-02-03T04:05:06"
+    assert to_datetime(value) is to_datetime(value)
+    assert to_datetime(value=True) is True
+
+
+def options_formatter(value, locale, options) -> str:  # noqa: ARG001
+    return ",".join(f"{k}={v!r}" for k, v in sorted(options.items()))
+
+
+@pytest.mark.parametrize(
+    ("message", "inputs", "formatted"),
+    [
+        ("{42 :opts}", None, ""),
+        ("{42 :opts digits=2 style=short}", None, "digits=2,style='short'"),
+        ("{42 :opts digits=$d}", {"d": "3"}, "digits=3"),
+        ("{42 :opts unknown=1 digits=$d}", {"d": 3}, "digits=3"),
+        ("{42 :opts unknown=$x}", {"x": "abc"}, ""),
+    ],
+)
+def test_option_schema(message, inputs, formatted):
+    registry = default_registry.extend(
+        formatters={"opts": options_formatter},
+        schemas={"opts": {"digits": digits, "style": one_of("short", "long")}},
+    )
+    compiled = compile_message(Message(message).datamodel, registry)
+    assert _format_message(compiled, get_locale("en"), inputs or {}, registry) == formatted
+
+
+@pytest.mark.parametrize(
+    ("message", "inputs"),
+    [
+        ("{42 :number style=unknown}", None),
+        ("{42 :number minimumFractionDigits=-1}", None),
+        ("{42 :number style=$style}", {"style": "unknown"}),
+        ("{42 :integer select=$select}", {"select": "unknown"}),
+        (".local $x = {42 :number style=unknown} {{{$x}}}", None),
+    ],
+)
+def test_option_schema_errors(message, inputs):
+    with pytest.raises(InvalidExpression):
+        Message(message).format(inputs, "en")
+
+
+@pytest.mark.parametrize(
+    ("message", "inputs", "formatted"),
+    [
+        (".local $y = {1 :number style=bogus} {{Hello}}", None, "Hello"),
+        (".match {$x :string}\na {{A {1 :number style=bogus}}}\n* {{Other}}", {"x": "b"}, "Other"),
+    ],
+)
+def test_invalid_options_not_evaluated(message, inputs, formatted):
+    message = Message(message)
+    assert message.format(inputs, "en") == formatted
+    with pytest.raises(InvalidExpression):
+        check_options(message.datamodel, default_registry)
+
+
+def test_extend_drops_overridden_schemas():
+    registry = default_registry.extend(formatters={"number": options_formatter})
+    assert "number" not in registry.schemas
+    assert "integer" in registry.schemas
+    assert Message("{42 :number custom=yes}").format(locale="en", formatters=registry.formatters) == "custom='yes'"
+
+
+def test_option_schema_uncompiled():
+    registry = default_registry.extend(formatters={"opts": options_formatter}, schemas={"opts": {"digits": digits}})
+    ast = Message("{42 :opts digits=2 other=3}").datamodel
+    assert _format_message(ast, get_locale("en"), {}, registry) == "digits=2"
+
+
+_numbers = [
+    0,
+    1,
+    -1,
+    7,
+    42,
+    999,
+    1000,
+    -1000,
+    12345,
+    123456,
+    1234567,
+    -98765432,
+    10**14 + 7,
+    1.0,
+    -1234.0,
+    1e10,
+    Decimal(0),
+    Decimal(1234567),
+    Decimal("1234567.000"),
+    Decimal("-1E+3"),
+]
+
+# Numbers which are formatted by babel
+_fallback_numbers = [-0.0, 2.5, Decimal("-0"), Decimal("12.34"), 10**20]
+
+
+@pytest.mark.parametrize("locale", [*locale_identifiers()[::3], "ar_EG", "hi_IN", "fa", "de_CH", "my", "bn"])
+def test_number_fast_path(locale):
+    locale = get_locale(locale)
+    for number, style, numbering_system, group_separator in itertools.product(
+        [*_numbers, *_fallback_numbers], ["decimal", "percent"], ["default", "latn"], [True, False]
+    ):
+        try:
+            expected = (format_decimal if style == "decimal" else format_percent)(
+                number, locale=locale, group_separator=group_separator, numbering_system=numbering_system
+            )
+        except UnsupportedNumberingSystemError:
+            continue
+        formatted = _format_integer_fast(
+            number, locale, style=style, numbering_system=numbering_system, group_separator=group_separator
+        )
+        # Every locale pattern is supported, so only the fallback numbers take the generic path
+        assert formatted == (None if any(number is n for n in _fallback_numbers) else expected)
+
+
+@pytest.mark.parametrize(
+    ("number", "formatted"),
+    [(1234567, "1,234,567"), (-1234.0, "-1,234"), (Decimal("1E+3"), "1,000"), (12.5, None), (True, None)],
+)
+def test_number_fast_path_types(number, formatted):
+    locale = get_locale("en")
+    assert (
+        _format_integer_fast(number, locale, style="decimal", numbering_system="latn", group_separator=True)
+        == formatted
+    )
+
+
+def test_number_fast_path_numpy():
+    np = pytest.importorskip("numpy")
+    locale = get_locale("en")
+    for number in [np.int64(-1234), np.uint8(200), np.float64(1234.0)]:
+        assert _format_integer_fast(
+            number, locale, style="decimal", numbering_system="latn", group_separator=True
+        ) == format_decimal(number, locale=locale)
+    assert (
+        _format_integer_fast(np.float32(1234), locale, style="decimal", numbering_system="latn", group_separator=True)
+        is None
+    )
@@ -0,0 +1,335 @@
+import hashlib
+import json
+import os
+from collections.abc import Iterator
+
+import pytest
+from click.testing import CliRunner
+
+import messageformat2
+from messageformat2 import Message
+from messageformat2 import cli as cli_module
+from messageformat2.catalog import load_catalog
+from messageformat2.cli import cli
+
+
+@pytest.fixture
+def sources(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "b.py").write_text('print(_("Second"))\n')
+    (tmp_path / "a.py").write_text('_("First")\nx = _("Hello, {$name}!", "context")\n')
+    (tmp_path / "pkg" / "c.py").write_text('def f():\n    return _("Third")\n')
+    (tmp_path / "pkg" / "d.py").write_text("nothing = 42\n")
+    return tmp_path
+
+
+def expected_output(*messages):
+    return "".join(f"{hashlib.sha256(m.encode()).hexdigest()} = {m}\n\n" for m in messages) + "\n"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_extract(sources, jobs):
+    result = CliRunner().invoke(cli, ["extract", "--jobs", jobs, str(sources)])
+    assert result.exit_code == 0
+    assert result.output == expected_output("First", "Hello, {$name}!", "Second", "Third")
+
+
+def test_extract_file(sources):
+    result = CliRunner().invoke(cli, ["extract", str(sources / "b.py")])
+    assert result.exit_code == 0
+    assert result.output == expected_output("Second")
+
+
+def test_extract_cache(sources, tmp_path_factory, monkeypatch):
+    cache = tmp_path_factory.mktemp("cache") / "extract.json"
+    args = ["extract", "--cache", str(cache), str(sources)]
+
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0
+    assert cache.exists()
+
+    parsed = []
+    monkeypatch.setattr(cli_module, "extract_messages", lambda source: parsed.append(source) or [])
+    result = CliRunner().invoke(cli, args)
+    assert result.output == expected_output("First", "Hello, {$name}!", "Second", "Third")
+    assert parsed == []
+
+    # Touching a file without changing it only rehashes it
+    os.utime(sources / "b.py", ns=(0, 0))
+    result = CliRunner().invoke(cli, args)
+    assert result.output == expected_output("First", "Hello, {$name}!", "Second", "Third")
+    assert parsed == []
+
+    (sources / "b.py").write_text('print(_("Changed"))\n')
+    result = CliRunner().invoke(cli, args)
+    assert parsed == [b'print(_("Changed"))\n']
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "{not json",
+        "[]",
+        '{"version": 1}',
+        '{"version": 1, "files": []}',
+        '{"version": 1, "files": {"b.py": {"size": 1}}}',
+    ],
+)
+def test_extract_invalid_cache(sources, tmp_path_factory, content):
+    cache = tmp_path_factory.mktemp("cache") / "extract.json"
+    cache.write_text(content.replace('"b.py"', json.dumps(os.fspath((sources / "b.py").resolve()))))
+    result = CliRunner().invoke(cli, ["extract", "--cache", str(cache), str(sources / "b.py")])
+    assert result.exit_code == 0
+    assert result.output == expected_output("Second")
+
+
+def test_extract_prefilter(sources, monkeypatch):
+    (sources / "empty.py").write_text("")
+    (sources / "spaced.py").write_text('_ (\n    "Spaced"\n)\n')
+    parsed = []
+    extract_messages = cli_module.extract_messages
+    monkeypatch.setattr(
+        cli_module, "extract_messages", lambda source: parsed.append(source) or extract_messages(source)
+    )
+
+    result = CliRunner().invoke(cli, ["extract", "--stats", str(sources)])
+    assert result.exit_code == 0
+    assert result.stdout == expected_output("First", "Hello, {$name}!", "Second", "Third", "Spaced")
+    assert result.stderr == "parsed: 4, skipped: 2, cached: 0\n"
+    assert len(parsed) == 4
+
+
+def test_parallel_map_bounded():
+    consumed = []
+
+    def items() -> Iterator[int]:
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+
+    results = cli_module.parallel_map(str, items(), jobs=2, chunksize=10)
+    assert next(results) == "0"
+    # Only the first few chunks were submitted
+    assert len(consumed) <= 10 * 5
+    assert list(results) == [str(i) for i in range(1, 1000)]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "catalog"
+    path.mkdir()
+    (path / "en.json").write_text(
+        json.dumps(
+            {
+                "greeting": "Hello, {$name}!",
+                "count": ".match {$count :integer} one {{One item}} * {{{$count} items}}",
+            }
+        )
+    )
+    (path / "cs.json").write_text(json.dumps({"greeting": "Ahoj, {$name}!"}))
+    return path
+
+
+def test_compile(catalog, tmp_path):
+    output = tmp_path / "messages.bin"
+    result = CliRunner().invoke(cli, ["compile", str(catalog), "-o", str(output)])
+    assert result.exit_code == 0
+    assert result.stdout == f"Compiled 3 message(s) in 2 locale(s) to {output}\n"
+
+    messages = load_catalog(output)
+    assert sorted(messages) == ["cs", "en"]
+    assert messages["cs"]["greeting"].format({"name": "Alice"}) == "Ahoj, Alice!"
+    assert messages["en"]["count"].format({"count": 1}, "en") == "One item"
+
+
+def test_compile_errors(catalog, tmp_path):
+    (catalog / "de.json").write_text(
+        json.dumps({"ok": "Hallo", "syntax": "{$name", "fallback": ".match {$x :number} 1 {{}}"})
+    )
+    output = tmp_path / "messages.bin"
+    result = CliRunner().invoke(cli, ["compile", str(catalog), "-o", str(output)])
+    assert result.exit_code == 1
+    syntax, fallback, summary = result.stderr.splitlines()
+    assert syntax.startswith("de:syntax:6: ParseError: ")
+    assert fallback == "de:fallback: MissingFallbackVariant: Missing fallback variant"
+    assert summary == f"Error: 2 invalid message(s), {output} was not written"
+    assert not output.exists()
+
+
+def test_compile_invalid_options(catalog, tmp_path):
+    (catalog / "de.json").write_text(json.dumps({"unused": ".local $x = {42 :number style=bogus} {{Hallo}}"}))
+    output = tmp_path / "messages.bin"
+    result = CliRunner().invoke(cli, ["compile", str(catalog), "-o", str(output)])
+    assert result.exit_code == 1
+    assert result.stderr.splitlines()[0].startswith("de:unused: InvalidExpression: ")
+    assert not output.exists()
+
+
+@pytest.mark.parametrize(
+    ("content", "error"),
+    [
+        ("{bad", "invalid JSON: "),
+        ("[1, 2]", "expected an object mapping message ids to messages, got list"),
+        ('{"a": 5}', "message 'a' must be a string, got int"),
+    ],
+)
+@pytest.mark.parametrize("command", ["compile", "validate", "bench", "format"])
+def test_invalid_catalog_file(catalog, tmp_path, content, error, command):
+    (catalog / "de.json").write_text(content)
+    args = {
+        "compile": ["compile", str(catalog), "-o", str(tmp_path / "messages.bin")],
+        "validate": ["validate", str(catalog)],
+        "bench": ["bench", str(catalog), "-n", "1"],
+        "format": ["format", "--catalog", str(catalog)],
+    }[command]
+    result = CliRunner().invoke(cli, args, input="")
+    assert result.exit_code == 1
+    assert result.stderr.startswith(f"Error: {catalog / 'de.json'}: {error}")
+
+
+def test_load_catalog_version(catalog, tmp_path, monkeypatch):
+    output = tmp_path / "messages.bin"
+    CliRunner().invoke(cli, ["compile", str(catalog), "-o", str(output)])
+    monkeypatch.setattr(messageformat2, "__version__", "0.0.0")
+    with pytest.raises(ValueError, match="compiled with messageformat2"):
+        load_catalog(output)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_bench(catalog, tmp_path, suffix):
+    inputs = tmp_path / f"inputs{suffix}"
+    if suffix == ".json":
+        inputs.write_text(json.dumps({"greeting": {"name": "Alice"}, "count": [{"count": 1}, {"count": 5}]}))
+    else:
+        inputs.write_text('{"id": "greeting", "inputs": {"name": "Alice"}}\n{"id": "count", "inputs": {"count": 1}}\n')
+    result = CliRunner().invoke(cli, ["bench", str(catalog), "--inputs", str(inputs), "-l", "en", "-n", "5"])
+    assert result.exit_code == 0
+    header, *rows, total = result.stdout.splitlines()
+    assert header.split() == ["locale", "id", "parse", "p50", "format/s", "p50", "p95", "p99"]
+    assert [row.split()[:2] for row in rows] == [["en", "greeting"], ["en", "count"]]
+    assert total.startswith("Total: ")
+
+
+def test_bench_errors(catalog):
+    result = CliRunner().invoke(cli, ["bench", str(catalog), "-l", "cs", "-n", "2"])
+    assert result.exit_code == 0
+    assert result.stdout.splitlines()[1].split()[:3] == ["cs", "greeting", "UnresolvedVariable:"]
+
+
+def test_bench_unknown_locale(catalog):
+    (catalog / "de.json").write_text(json.dumps({"greeting": "Hallo"}))
+    (catalog / "xx_YY.json").write_text(json.dumps({"greeting": "Hello"}))
+    result = CliRunner().invoke(cli, ["bench", str(catalog), "-l", "xx_YY", "-l", "de", "-n", "2"])
+    assert result.exit_code == 0
+    rows = [row.split()[:3] for row in result.stdout.splitlines()[1:]]
+    assert rows[0] == ["xx_YY", "greeting", "UnknownLocaleError:"]
+    assert rows[1][:2] == ["de", "greeting"]
+    assert result.stdout.splitlines()[-1].startswith("Total: ")
+
+
+def test_bench_warm_up(catalog, monkeypatch):
+    formatted = []
+    measured = []
+
+    def measure(fn, iterations) -> list[int]:  # noqa: ARG001
+        measured.append(len(formatted))
+        return [1] * iterations
+
+    monkeypatch.setattr(cli_module, "measure", measure)
+    monkeypatch.setattr(Message, "format", lambda *args: formatted.append(args) or "")
+    result = CliRunner().invoke(cli, ["bench", str(catalog), "-l", "cs", "-n", "3"])
+    assert result.exit_code == 0
+    # Parsing is measured first, formatting only after the message was formatted once
+    assert measured == [0, 1]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_validate(catalog, jobs):
+    result = CliRunner().invoke(cli, ["validate", str(catalog), "--jobs", jobs])
+    assert result.exit_code == 0
+    assert result.stdout == "3 message(s) in 2 locale(s), 0 invalid\n"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_validate_errors(catalog, jobs):
+    (catalog / "de.json").write_text(
+        json.dumps({"syntax": "Hello {$name", "ok": "Hallo", "keys": ".match {$x :number} 1 2 {{}} * {{}}"})
+    )
+    result = CliRunner().invoke(cli, ["validate", str(catalog), "--jobs", jobs])
+    assert result.exit_code == 1
+    syntax, keys, summary = result.stderr.splitlines()
+    assert syntax.startswith("de:syntax:12: ParseError: ")
+    assert keys.startswith("de:keys: VariantKeyMismatch: ")
+    assert summary == "Error: 6 message(s) in 3 locale(s), 2 invalid"
+
+
+def test_validate_invalid_options(catalog):
+    (catalog / "de.json").write_text(json.dumps({"option": "{42 :number style=bogus}", "variable": "{$x :number}"}))
+    result = CliRunner().invoke(cli, ["validate", str(catalog)])
+    assert result.exit_code == 1
+    option, summary = result.stderr.splitlines()
+    assert option.startswith("de:option: InvalidExpression: ")
+    assert summary == "Error: 5 message(s) in 3 locale(s), 1 invalid"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+@pytest.mark.parametrize("compiled", [True, False])
+def test_format(catalog, tmp_path, jobs, compiled):
+    if compiled:
+        output = tmp_path / "messages.bin"
+        CliRunner().invoke(cli, ["compile", str(catalog), "-o", str(output)])
+        catalog = output
+    records = [
+        {"message": "Hello, {$name}!", "inputs": {"name": "Alice"}},
+        {"id": "greeting", "locale": "cs", "inputs": {"name": "Bob"}},
+        {"id": "count", "inputs": {"count": 1}},
+        {"id": "count", "inputs": {"count": 3}},
+        {"id": "missing"},
+        {"message": "Hello, {$name}!"},
+    ]
+    stdin = "\n".join(json.dumps(record) for record in records) + "\n\nnot json\n"
+    args = ["format", "--catalog", str(catalog), "--locale", "en", "--jobs", jobs, "--batch-size", "2"]
+    result = CliRunner().invoke(cli, args, input=stdin)
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"output": "Hello, Alice!"},
+        {"id": "greeting", "output": "Ahoj, Bob!"},
+        {"id": "count", "output": "One item"},
+        {"id": "count", "output": "3 items"},
+        {"id": "missing", "error": "LookupError: Unknown message: missing (en)"},
+        {"error": "UnresolvedVariable: Unresolved variable: name"},
+        {"error": "JSONDecodeError: Expecting value: line 1 column 1 (char 0)"},
+    ]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_format_invalid_records(catalog, jobs):
+    records = [
+        {"message": "Hello", "locale": "xx_YY"},
+        42,
+        ["greeting"],
+        {"message": "Hello, {$name}!", "inputs": ["Alice"]},
+        {"message": 42},
+        {"id": ["greeting"]},
+        {"message": "Hello, {$name}!", "inputs": {"name": "Alice"}},
+    ]
+    stdin = "\n".join(json.dumps(record) for record in records) + "\n"
+    args = ["format", "--catalog", str(catalog), "--locale", "en", "--jobs", jobs]
+    result = CliRunner().invoke(cli, args, input=stdin)
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"error": "UnknownLocaleError: unknown locale 'xx_YY'"},
+        {"error": "ValueError: Expected a JSON object, got: 42"},
+        {"error": 'ValueError: Expected a JSON object, got: ["greeting"]'},
+        {"error": "ValueError: Invalid inputs, expected a JSON object: ['Alice']"},
+        {"error": "ValueError: Invalid message, expected a string: 42"},
+        {"id": ["greeting"], "error": "LookupError: Unknown message: ['greeting'] (en)"},
+        {"output": "Hello, Alice!"},
+    ]
+
+
+def test_format_invalid_catalog(catalog):
+    (catalog / "de.json").write_text(json.dumps({"syntax": "Hello {$name"}))
+    result = CliRunner().invoke(cli, ["format", "--catalog", str(catalog)], input="")
+    assert result.exit_code == 1
+    assert "1 invalid message(s)" in result.stderr
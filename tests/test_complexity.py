@@ -0,0 +1,112 @@
+"""Guard against superlinear parsing of adversarial messages.
+
+Each case generates a message whose size grows with `n` and stresses a single
+grammar rule. The parse time must grow roughly linearly with `n`: scaling the
+input by `SCALE` may slow down parsing by at most `MAX_RATIO`, which leaves
+room for timing noise while catching parsers which copy the remaining input
+on every step.
+
+The timing tests depend on the load of the machine and are only run with
+`pytest --run-slow`.
+"""
+
+import gc
+import time
+from collections.abc import Callable
+
+import pytest
+
+from messageformat2.errors import MessageTooLarge
+from messageformat2.message import Message
+from messageformat2.parser import parse
+
+
+SMALL = 1_000
+SCALE = 10
+MAX_RATIO = SCALE * 2
+
+
+def variants(n: int) -> str:
+    lines = [".input {$x :integer}", ".match {$x}"]
+    lines.extend(f"{i} {{{{Variant {i}}}}}" for i in range(n))
+    lines.append("* {{Other}}")
+    return "\n".join(lines)
+
+
+def selectors(n: int) -> str:
+    declarations = "".join(f".input {{$x{i} :integer}}\n" for i in range(n))
+    names = " ".join(f"{{$x{i}}}" for i in range(n))
+    return f"{declarations}.match {names}\n{' '.join(['*'] * n)} {{{{Other}}}}"
+
+
+CASES: dict[str, Callable[[int], str]] = {
+    "text": lambda n: "Hello, World! " * n,
+    "text escapes": lambda n: r"\{\}\\" * n,
+    "placeholders": lambda n: "{$name}" * n,
+    "literal placeholders": lambda n: "{|literal|} {42}" * n,
+    "quoted literal": lambda n: f"{{|{'x' * n}|}}",
+    "quoted literal escapes": lambda n: f"{{|{r'\|\\' * n}|}}",
+    "number literal": lambda n: f"{{{'1' * n}}}",
+    "name": lambda n: f"{{$x{'y' * n}}}",
+    "whitespace": lambda n: f"{{{' ' * n}$name{' ' * n}}}",
+    "indentation": lambda n: f".local $x = {{1}}{' ' * n}\n{' ' * n}{{{{{{$x}}}}}}",
+    "options": lambda n: "{$x :fn " + " ".join(f"opt{i}=|value|" for i in range(n)) + "}",
+    "attributes": lambda n: "{$x " + " ".join(f"@attr{i}=value" for i in range(n)) + "}",
+    "markup": lambda n: "{#tag " + " ".join(f"opt{i}=$x" for i in range(n)) + "}text{/tag}",
+    "reserved body": lambda n: "{!" + " ".join(f"part{i} |q|" for i in range(n)) + "}",
+    "reserved statement": lambda n: ".unknown " + "body " * n + "{$x}\n.match {$y :integer}\n* {{Other}}",
+    "declarations": lambda n: "".join(f".local $x{i} = {{{i}}}\n" for i in range(n)) + "{{Pattern}}",
+    "declaration chain": lambda n: (
+        ".input {$x0 :integer}\n"
+        + "".join(f".local $x{i + 1} = {{$x{i}}}\n" for i in range(n))
+        + f".match {{$x{n}}}\n* {{{{Other}}}}"
+    ),
+    "variants": variants,
+    "selectors": lambda n: selectors(n // 10),
+    "variant keys": lambda n: selectors(n // 10).replace("{{Other}}", "{{Other}}\n" + "1 " * (n // 10) + "{{One}}"),
+}
+
+
+def parse_time(message: str) -> float:
+    timings = []
+    # Garbage collection pauses grow with the number of live objects
+    gc.disable()
+    try:
+        for _ in range(3):
+            start = time.perf_counter()
+            parse(message)
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("generate", CASES.values(), ids=CASES.keys())
+def test_linear_parsing(generate):
+    small_message, large_message = generate(SMALL), generate(SMALL * SCALE)
+    ratios = []
+    # Superlinear parsing fails consistently while noise from other processes
+    # is transient, so only fail if the bound is exceeded repeatedly
+    for _ in range(3):
+        # Guard against timer resolution for very fast cases
+        ratio = parse_time(large_message) / max(parse_time(small_message), 1e-4)
+        if ratio < MAX_RATIO:
+            return
+        ratios.append(ratio)
+    pytest.fail(f"Parse time grew superlinearly: {ratios}")
+
+
+@pytest.mark.parametrize("generate", CASES.values(), ids=CASES.keys())
+def test_adversarial_messages_parse(generate):
+    # The timings are only meaningful if the whole message is parsed
+    parse(generate(100))
+
+
+def test_max_length():
+    message = "Hello, {$name}!"
+    assert Message(message, max_length=len(message)).format({"name": "Alice"}) == "Hello, Alice!"
+
+    with pytest.raises(MessageTooLarge, match="15 characters") as exc_info:
+        Message(message, max_length=len(message) - 1)
+    assert exc_info.value.position == len(message) - 1
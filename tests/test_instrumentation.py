@@ -0,0 +1,118 @@
+import pytest
+
+from messageformat2 import Message, instrumentation
+from messageformat2.runtime import LazyValue
+
+
+@pytest.fixture(autouse=True)
+def clean_instrumentation():
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_by_default():
+    original = LazyValue.format
+    assert not instrumentation.is_enabled()
+
+    Message("{42 :number}").format(locale="en")
+    assert instrumentation.stats() == instrumentation.Stats(messages={}, formatters={}, selectors={})
+
+    instrumentation.enable()
+    assert LazyValue.format is not original
+    instrumentation.disable()
+    assert LazyValue.format is original
+
+
+def test_stats():
+    message = """\
+.match {$count :integer}
+one {{{$count :number} item}}
+*   {{{$count :number} items}}"""
+    instrumentation.enable()
+    for count in range(10):
+        Message(message).format({"count": count}, "en")
+    Message("Hello, {$name}!").format({"name": "Alice"}, "en")
+
+    stats = instrumentation.stats()
+    assert set(stats.messages) == {message, "Hello, {$name}!"}
+    assert stats.messages[message].count == 10
+    assert stats.formatters["number"].count == 10
+    assert stats.selectors == {"integer": stats.selectors["integer"]}
+    assert stats.selectors["integer"].count == 10
+
+    timing = stats.messages[message]
+    assert 0 < timing.p50 <= timing.p95 <= timing.p99 <= timing.total
+    # Formatting the whole message takes longer than the functions it calls
+    assert timing.total > stats.formatters["number"].total
+
+
+def test_callback():
+    events = []
+    instrumentation.enable(events.append)
+    Message("{42 :number}").format(locale="en")
+
+    assert [(event.kind, event.name) for event in events] == [("formatter", "number"), ("message", "{42 :number}")]
+    assert all(event.duration > 0 for event in events)
+
+
+def test_failing_callback():
+    def callback(event) -> None:
+        raise RuntimeError(event.name)
+
+    instrumentation.enable(callback)
+    with pytest.warns(RuntimeWarning, match="Instrumentation callback failed"):
+        assert Message("Hi").format() == "Hi"
+    with pytest.warns(RuntimeWarning), pytest.raises(Exception, match="Unknown function"):
+        Message("{42 :unknown}").format()
+    assert instrumentation.stats().messages["Hi"].count == 1
+
+
+def test_max_names(monkeypatch):
+    monkeypatch.setattr(instrumentation, "MAX_NAMES", 2)
+    events = []
+    instrumentation.enable(events.append)
+    for name in ["a", "b", "c"]:
+        Message(name).format()
+    assert set(instrumentation.stats().messages) == {"a", "b"}
+    assert [event.name for event in events] == ["a", "b", "c"]
+
+    instrumentation.reset()
+    Message("c").format()
+    assert set(instrumentation.stats().messages) == {"c"}
+
+
+def test_constant_placeholders_are_counted():
+    message = Message("{42 :number} {$x :number}")
+    # Constant placeholders folded before instrumentation was enabled are formatted again
+    message.format({"x": 1}, "en")
+    instrumentation.enable()
+    for _ in range(3):
+        assert message.format({"x": 1}, "en") == "42 1"
+    assert instrumentation.stats().formatters["number"].count == 6
+
+    instrumentation.disable()
+    instrumentation.reset()
+    assert message.format({"x": 1}, "en") == "42 1"
+    assert instrumentation.stats().formatters == {}
+
+
+def test_errors_are_recorded():
+    instrumentation.enable()
+    with pytest.raises(Exception, match="Unknown function"):
+        Message("{42 :unknown}").format()
+
+    stats = instrumentation.stats()
+    assert stats.messages["{42 :unknown}"].count == 1
+    assert stats.formatters["unknown"].count == 1
+
+
+def test_reset():
+    instrumentation.enable()
+    Message("{42 :number}").format(locale="en")
+    instrumentation.disable()
+    assert instrumentation.stats().messages["{42 :number}"].count == 1
+
+    instrumentation.reset()
+    assert instrumentation.stats().messages == {}
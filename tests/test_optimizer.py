@@ -0,0 +1,88 @@
+import pytest
+
+from messageformat2 import Message
+from messageformat2.datamodel import PatternMessage
+from messageformat2.optimizer import MessageOptimizer
+from messageformat2.parser import parse
+
+
+@pytest.mark.parametrize(
+    ("message", "optimized"),
+    [
+        ("Hello, world!", "Hello, world!"),
+        # Literal placeholders are merged into the surrounding text
+        ("Hello, {|world|}{|!|}", "Hello, world!"),
+        ("{||}", ""),
+        ("{|1| :number}", "{|1| :number}"),
+        # Unused declarations are removed
+        (".input {$x :number} .local $y = {$x :integer} {{text}}", "text"),
+        (".local $unused = {$x :number maximumFractionDigits=1} {{text}}", "text"),
+        (".local $unused = {|1| :number style=bogus} {{text}}", "text"),
+        (
+            ".input {$x :number} .local $y = {$x :integer} {{{$y}}}",
+            ".input {$x :number} .local $y = {$x :integer} {{{$y}}}",
+        ),
+        # Trivial locals are inlined
+        (".local $y = {$x} {{{$y :number}}}", "{$x :number}"),
+        (".local $y = {|lit|} {{a {$y} b}}", "a lit b"),
+        (".local $y = {|lit|} {{{$y :string}}}", "{|lit| :string}"),
+        (".local $a = {$x} .local $b = {$a} {{{$b}}}", "{$x}"),
+        (".local $a = {|1|} {{{:number style=$a}}}", "{:number style=|1|}"),
+        (".input {$x :number} .local $y = {$x} {{{$y}}}", ".input {$x :number} {{{$x}}}"),
+        (
+            ".local $y = {$x} .local $unused = {$z} .match {$y :integer} 1 {{one {|!|}}} * {{{$y}}}",
+            ".match {$x :integer} 1 {{one !}} * {{{$x}}}",
+        ),
+        # Unsupported statements are kept
+        (
+            ".unknown {$x} .local $z = {$x :number} .match {$y :integer} * {{text}}",
+            ".unknown {$x} .match {$y :integer} * {{text}}",
+        ),
+    ],
+)
+def test_optimize(message, optimized):
+    assert parse(message, optimize=True) == parse(optimized)
+
+
+def test_optimize_in_place():
+    ast = parse(".local $y = {$x} {{{$y}}}")
+    assert MessageOptimizer().visit(ast) is ast
+    expected = parse("{$x}")
+    assert isinstance(expected, PatternMessage)
+    assert ast == PatternMessage(declarations=[], pattern=expected.pattern)
+
+
+def capitalize(value, locale, options):  # noqa: ARG001
+    return value.capitalize() if options.get("enable", "yes") == "yes" else value
+
+
+@pytest.mark.parametrize(
+    ("message", "inputs"),
+    [
+        ("Hello, {|world|}{|!|}", None),
+        (".local $user = {$name} {{Hello, {$user :capitalize}!}}", {"name": "alice"}),
+        (".local $user = {$name :capitalize} .local $alias = {$user} {{Hello, {$alias}!}}", {"name": "alice"}),
+        (".local $flag = {|no|} {{{|alice| :capitalize enable=$flag} {#b opt=$flag}x{/b}}}", None),
+        (".input {$count :number} .local $unused = {$missing} {{{$count}}}", {"count": 1234.5}),
+        (".local $n = {|42|} .local $m = {$n} {{{$m :number} {$n}}}", None),
+        (
+            """\
+.input {$count :integer}
+.local $c = {$count}
+.local $word = {|items|}
+.local $unused = {$count :number}
+.match {$c}
+0   {{No {$word}}}
+one {{One item}}
+*   {{{$c} {$word}}}""",
+            {"count": 3},
+        ),
+    ],
+)
+@pytest.mark.parametrize("strict", [True, False])
+def test_formatting_equivalence(message, inputs, strict):
+    errors, optimized_errors = (None, None) if strict else ([], [])
+    expected = Message(message).format(inputs, "en", formatters={"capitalize": capitalize}, errors=errors)
+    optimized = Message(message, optimize=True)
+    assert optimized.format(inputs, "en", formatters={"capitalize": capitalize}, errors=optimized_errors) == expected
+    assert errors == optimized_errors
@@ -1,3 +1,4 @@
+import cProfile
 import itertools
 from pathlib import Path
 from subprocess import PIPE, Popen
@@ -12,7 +13,7 @@ from messageformat2.errors import (
     ParseError,
     VariantKeyMismatch,
 )
-from messageformat2.parser import parse
+from messageformat2.parser import ParseProfile, parse
 
 
 def ruff_format(source):
@@ -202,6 +203,14 @@ def test_parse_unsupported_statement(request, snapshot, message):
 * {{You have no notifications.}}""",
             MissingSelectorAnnotation,
         ),
+        (
+            """\
+.local $a = {$b}
+.local $b = {$a}
+.match {$a}
+* {{Circular reference}}""",
+            MissingSelectorAnnotation,
+        ),
     ],
 )
 def test_data_model_errors(message, error):
@@ -233,3 +242,54 @@ def test_data_model_errors(message, error):
 def test_parse_errors(message):
     with pytest.raises(ParseError):
         parse(message)
+
+
+@pytest.mark.parametrize(
+    ("message", "position"),
+    [
+        ("}", 0),
+        ("Hello {$name", 12),
+        ("Hello {$name :fn opt}", 20),
+        (".local $x = {1} {{Missing end}", 30),
+    ],
+)
+def test_parse_error_position(message, position):
+    with pytest.raises(ParseError) as exc_info:
+        parse(message)
+    assert exc_info.value.position == position
+
+
+def test_parse_profile():
+    profile = ParseProfile()
+    assert profile.rules() == {}
+
+    message = "Hello, {$name :string}!"
+    assert parse(message, profile=profile) == parse(message)
+    parse(message, profile=profile)
+    with pytest.raises(ParseError):
+        parse("{$name", profile=profile)
+
+    rules = profile.rules()
+    assert rules["_parse_and_validate"].calls == 3
+    assert rules["parse_expression"].calls == 3
+    assert rules["parse_function_annotation"].calls == 2
+    assert 0 < rules["parse_expression"].self_time <= rules["parse_expression"].total_time
+    assert rules["parse_message"].total_time <= rules["_parse_and_validate"].total_time
+
+    report = profile.report(limit=3).splitlines()
+    assert report[0].split() == ["rule", "calls", "self", "(ms)", "total", "(ms)"]
+    assert len(report) == 4
+
+
+def test_parse_profile_other_profiler():
+    profile = ParseProfile()
+    other = cProfile.Profile()
+    other.enable()
+    try:
+        assert parse("Hello, {$name}!", profile=profile) == parse("Hello, {$name}!")
+    finally:
+        other.disable()
+    assert profile.rules() == {}
+
+    parse("Hello, {$name}!", profile=profile)
+    assert profile.rules()["parse_expression"].calls == 1
@@ -1,10 +1,28 @@
+from types import MappingProxyType
 from typing import Any
 
 import pytest
 from babel import Locale
 
 from messageformat2 import Message
-from messageformat2.errors import OperandMismatch, UnknownFunction, UnsupportedExpression, UnsupportedStatement
+from messageformat2.builtins import default_registry
+from messageformat2.datamodel import (
+    LiteralExpression,
+    Markup,
+    PatternMessage,
+    SelectMessage,
+    VariableExpression,
+    VariableRef,
+)
+from messageformat2.errors import (
+    InvalidExpression,
+    OperandMismatch,
+    UnknownFunction,
+    UnresolvedVariable,
+    UnsupportedExpression,
+    UnsupportedStatement,
+)
+from messageformat2.runtime import CompiledAnnotation, CompiledPattern
 
 
 def date(value, locale, options) -> str:  # noqa: ARG001
@@ -240,3 +258,214 @@ def test_gotchas(message, inputs, formatted):
 def test_errors(message, inputs, error):
     with pytest.raises(error):
         Message(message).format(inputs, formatters={"string": string_formatter_mutually_exclusive})
+
+
+def test_compiled_pattern():
+    expression = VariableExpression(arg=VariableRef(name="x"), annotation=None, attributes=[])
+    pattern = CompiledPattern(["a", "b", expression, "c", "d", "e", expression])
+    assert pattern == ["ab", expression, "cde", expression]
+    assert pattern.slots == (1, 3)
+    assert pattern.placeholders == ((1, expression), (3, expression))
+    assert pattern.template == ["ab", "", "cde", ""]
+    assert pattern.text is None
+
+    static = CompiledPattern(["Hello, ", "World!"])
+    assert static.slots == ()
+    assert static.text == "Hello, World!"
+
+
+def test_compiled_message_patterns():
+    message = Message(".match {$x :string}\nfoo {{Foo {$x}}}\n* {{Other}}")
+    compiled = message._compile(default_registry)  # noqa: SLF001
+    assert isinstance(compiled, SelectMessage)
+    assert all(isinstance(variant.value, CompiledPattern) for variant in compiled.variants)
+    # The parsed message is left untouched
+    assert isinstance(message.datamodel, SelectMessage)
+    assert not any(isinstance(variant.value, CompiledPattern) for variant in message.datamodel.variants)
+
+
+def test_many_placeholders():
+    count = 1000
+    message = Message("".join(f"{{$x{i}}}, " for i in range(count)))
+    inputs = {f"x{i}": i for i in range(count)}
+    assert message.format(inputs) == "".join(f"{i}, " for i in range(count))
+
+
+def test_static_options():
+    message = Message("{$x :number useGrouping=never style=percent} {$y :number useGrouping=$grouping}")
+    compiled = message._compile(default_registry)  # noqa: SLF001
+    assert isinstance(compiled, PatternMessage)
+    assert isinstance(compiled.pattern[0], VariableExpression)
+    assert isinstance(compiled.pattern[2], VariableExpression)
+    static, dynamic = compiled.pattern[0].annotation, compiled.pattern[2].annotation
+
+    assert isinstance(static, CompiledAnnotation)
+    assert isinstance(dynamic, CompiledAnnotation)
+    assert static.static == {"useGrouping": "never", "style": "percent"}
+    assert static.dynamic == ()
+    assert isinstance(static.static, MappingProxyType)
+
+    assert dynamic.static == {}
+    assert [opt.name for opt in dynamic.dynamic] == ["useGrouping"]
+
+    assert message.format({"x": 100, "y": 12345, "grouping": "never"}, "en") == "10000% 12345"
+    assert message.format({"x": 100, "y": 12345, "grouping": "auto"}, "en") == "10000% 12,345"
+
+
+def test_options_are_not_shared():
+    def pop(value, locale, options: dict[str, Any]) -> str:  # noqa: ARG001
+        return options.pop("suffix", "-")
+
+    message = Message("{$x :pop suffix=a} {$x :pop}")
+    for _ in range(2):
+        assert message.format({"x": 1}, formatters={"pop": pop}) == "a -"
+
+
+def test_static_markup():
+    message = Message('{#a href=|"/home"|}Home{/a} {#img src=$src /} {#br/}')
+    compiled = message._compile(default_registry)  # noqa: SLF001
+    assert isinstance(compiled, PatternMessage)
+    assert isinstance(compiled.pattern, CompiledPattern)
+    assert compiled.pattern[0] == '<a href="/home">Home</a> '
+    assert isinstance(compiled.pattern[1], Markup)
+    assert compiled.pattern[2] == " <br/>"
+    assert compiled.pattern.slots == (1,)
+
+    assert message.format({"src": "cat.png"}) == '<a href="/home">Home</a> <img src=cat.png/> <br/>'
+
+
+def test_constant_folding():
+    message = Message("{|1000| :number} {$x :number} {|abc| :number}")
+    assert message.format({"x": 2000}, "en", errors=[]) == "1,000 2,000 {|abc|}"
+    assert message.format({"x": 2000}, "de", errors=[]) == "1.000 2.000 {|abc|}"
+
+    en = message._compile(default_registry, Locale.parse("en"))  # noqa: SLF001
+    assert en is message._compile(default_registry, Locale.parse("en"))  # noqa: SLF001
+    assert isinstance(en, PatternMessage)
+    assert isinstance(en.pattern, CompiledPattern)
+    assert en.pattern[0] == "1,000 "
+    # Expressions which fail are kept so that the error is reported on every call
+    assert en.pattern.slots == (1, 3)
+    # The compiled message is shared between locales and left untouched
+    compiled = message._compile(default_registry)  # noqa: SLF001
+    assert isinstance(compiled, PatternMessage)
+    assert isinstance(compiled.pattern[0], LiteralExpression)
+
+    calls = []
+
+    def upper(value, locale, options) -> str:  # noqa: ARG001
+        calls.append(value)
+        return value.upper()
+
+    impure = default_registry.extend(formatters={"upper": upper})
+    pure = default_registry.extend(formatters={"upper": upper}, pure={"upper"})
+    assert "upper" not in impure.pure
+    message = Message("{|a| :upper}")
+    for _ in range(3):
+        assert message.format(locale="en", formatters={"upper": upper}) == "A"
+    assert calls == ["a", "a", "a"]
+
+    calls.clear()
+    compiled = message._compile(pure, Locale.parse("en"))  # noqa: SLF001
+    assert isinstance(compiled, PatternMessage)
+    assert isinstance(compiled.pattern, CompiledPattern)
+    assert compiled.pattern.text == "A"
+    assert calls == ["a"]
+
+    # Replacing a pure formatter drops its purity
+    assert "number" not in default_registry.extend(formatters={"number": upper}).pure
+    # Naive values are formatted in the local time zone
+    message = Message("{|2024-06-07T10:00:00| :datetime}")
+    folded = message._compile(default_registry, Locale.parse("en"))  # noqa: SLF001
+    assert folded is message._compile(default_registry)  # noqa: SLF001
+
+
+def test_constant_folding_invalidation():
+    message = Message("{|abc| :string}")
+    assert message.format(locale="en") == "abc"
+    assert message.format(locale="en", formatters={"string": lambda value, locale, options: value.upper()}) == "ABC"  # noqa: ARG005
+    assert message.format(locale="en") == "abc"
+
+
+def failing_formatter(value, locale, options):  # noqa: ARG001
+    msg = "Boom"
+    raise RuntimeError(msg)
+
+
+@pytest.mark.parametrize(
+    ("message", "inputs", "formatted", "errors"),
+    [
+        ("Hello, {$name}!", None, "Hello, {$name}!", [UnresolvedVariable]),
+        ("{$a} and {$b}", {"b": "B"}, "{$a} and B", [UnresolvedVariable]),
+        ("{$x :number}", None, "{$x}", [UnresolvedVariable]),
+        ("{|dog| :unknown}", None, "{|dog|}", [UnknownFunction]),
+        ("{|a\\|b| :unknown}", None, "{|a\\|b|}", [UnknownFunction]),
+        ("{:unknown}", None, "{:unknown}", [UnknownFunction]),
+        ("{$x :fail}", {"x": 1}, "{$x}", [InvalidExpression]),
+        ("The value is {!horse}.", None, "The value is {!}.", [UnsupportedExpression]),
+        ("{$x !horse}", {"x": 1}, "{$x}", [UnsupportedExpression]),
+        ("{42 :number useGrouping=$grouping}", None, "42", [UnresolvedVariable]),
+        ("{#a href=$url}link{/a}", None, "<a>link</a>", [UnresolvedVariable]),
+        (".local $y = {$x :number}\n{{y = {$y}}}", None, "y = {$x}", [UnresolvedVariable]),
+        (".input {$x :number}\n{{x = {$x}}}", None, "x = {$x}", [UnresolvedVariable]),
+        (
+            ".match {$count :integer}\none {{One}}\n* {{Other}}",
+            None,
+            "Other",
+            [UnresolvedVariable],
+        ),
+        (
+            ".match {$count :unknown}\none {{One}}\n* {{Other}}",
+            {"count": 1},
+            "Other",
+            [UnknownFunction],
+        ),
+        (".unknown {$x}\n.match {$x :string}\n* {{x = {$x}}}", {"x": 1}, "x = 1", [UnsupportedStatement]),
+        # Invalid literal options are only reported if the expression is evaluated
+        ("Hi {$n} {42 :number style=bogus}", {"n": "a"}, "Hi a {|42|}", [InvalidExpression]),
+        (".local $y = {42 :number style=bogus}\n{{Hi}}", None, "Hi", []),
+        (".match {$x :number select=$s}\n1 {{One}}\n* {{Other}}", {"x": 1, "s": "bogus"}, "Other", [InvalidExpression]),
+        (".input {$x :number}\n.local $y = {$x :integer}\n{{{$y}}}", {"x": 1}, "{$x}", [OperandMismatch]),
+        ("Hello, {$name}!", {"name": "Alice"}, "Hello, Alice!", []),
+    ],
+)
+def test_non_strict(message, inputs, formatted, errors):
+    collected = []
+    assert Message(message).format(inputs, "en", formatters={"fail": failing_formatter}, errors=collected) == formatted
+    assert [type(error) for error in collected] == errors
+
+
+@pytest.mark.parametrize(
+    ("message", "inputs", "error"),
+    [
+        ("Hi {$n} {42 :number style=bogus}", {"n": "a"}, InvalidExpression),
+        (".match {$x :number select=$s}\n1 {{One}}\n* {{Other}}", {"x": 1, "s": "bogus"}, InvalidExpression),
+        (".input {$x :number}\n.local $y = {$x :integer}\n{{{$y}}}", {"x": 1}, OperandMismatch),
+    ],
+)
+def test_strict_errors(message, inputs, error):
+    message = Message(message)
+    # The outcome does not depend on whether the message was compiled in non-strict mode first
+    message.format(inputs, "en", errors=[])
+    for _ in range(2):
+        with pytest.raises(error):
+            message.format(inputs, "en")
+
+
+def test_non_strict_errors_are_not_shared():
+    message = Message("{42 :number style=bogus}")
+    first, second = [], []
+    message.format(errors=first)
+    message.format(errors=second)
+    assert [type(error) for error in first + second] == [InvalidExpression, InvalidExpression]
+    assert first[0] is not second[0]
+
+
+def test_non_strict_formatter_exception_cause():
+    errors = []
+    Message("{$x :fail}").format({"x": 1}, formatters={"fail": failing_formatter}, errors=errors)
+    assert isinstance(errors[0].__cause__, RuntimeError)
+
+    with pytest.raises(InvalidExpression) as exc_info:
+        Message("{$x :fail}").format({"x": 1}, formatters={"fail": failing_formatter})
+    assert isinstance(exc_info.value.__cause__, RuntimeError)